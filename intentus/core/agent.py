@@ -1,25 +1,32 @@
 import argparse
-import time
-import json
+import asyncio
+import inspect
 import os
+import re
+import sys
 import logging
-from typing import Optional, Dict, Any, List
+from typing import Optional, Callable, Dict, Any, List
 from dataclasses import dataclass
 
 from .config import CoreConfig
+from .cache import SemanticCache, ToolResultCache
+from .throttle import DualTokenBucket
 from .engine.factory import create_llm_engine
 from .initializer import Initializer
+from .utils import ensure_dir, install_uvloop, lazy_json
 from .planner import Planner
 from .memory import Memory
 from .executor import Executor
 from .formatters import QueryAnalysis, NextStep, MemoryVerification, ToolCommand
 
 # Set up logging
-logging.basicConfig(level=logging.DEBUG)
 logger = logging.getLogger(__name__)
 
+# dataclass(slots=True) is only available from Python 3.10
+_DATACLASS_SLOTS = {"slots": True} if sys.version_info >= (3, 10) else {}
 
-@dataclass
+
+@dataclass(frozen=True, **_DATACLASS_SLOTS)
 class AgentConfig:
     """Configuration for the Intentus agent."""
 
@@ -29,6 +36,15 @@ class AgentConfig:
     config_path: str = None
     max_steps: int = 5
     temperature: float = 0.7
+    cache_dir: str = None  # Enables the on-disk LLM response cache when set
+    requests_per_minute: int = None  # Client-side RPM limit for LLM calls
+    tokens_per_minute: int = None  # Client-side TPM limit for LLM calls
+    max_concurrent_tools: int = None  # Concurrent tool bound (None for $TOOL_CONCURRENCY_LIMIT or 8)
+    max_time: float = None  # Hard time budget for a run in seconds (None for no limit)
+    memory_window: int = 4  # Recent actions shown verbatim in planning prompts (0 for all)
+    max_history: int = None  # Actions kept in memory (None for all)
+    plan_ahead: int = 0  # Steps planned per call and run in dependency waves (0 for one at a time)
+    warm_up_tools: int = 2  # Tools predicted from the query analysis and warmed up early (0 to disable)
 
 
 class IntentusAgent:
@@ -36,10 +52,41 @@ class IntentusAgent:
 
     def __init__(self, config: AgentConfig):
         """Initialize the agent."""
-        logger.debug(f"Initializing IntentusAgent with config: {config}")
+        logger.debug("Initializing IntentusAgent with config: %s", config)
         self.config = config
-        self.llm_engine = create_llm_engine(config.llm_engine)
-        logger.debug(f"Created LLM engine: {self.llm_engine}")
+
+        # Share one rate limiter between every LLM engine of the agent
+        self.throttle = None
+        if config.requests_per_minute or config.tokens_per_minute:
+            self.throttle = DualTokenBucket(
+                requests_per_minute=config.requests_per_minute,
+                tokens_per_minute=config.tokens_per_minute,
+            )
+            logger.debug(
+                "Rate limiting LLM calls to %s RPM, %s TPM",
+                config.requests_per_minute,
+                config.tokens_per_minute,
+            )
+
+        self.llm_engine = create_llm_engine(config.llm_engine, throttle=self.throttle)
+        logger.debug("Created LLM engine: %s", self.llm_engine)
+
+        # Share one response cache between planner and executor
+        self.cache = None
+        self.tool_cache = None
+        if config.cache_dir:
+            ensure_dir(config.cache_dir)
+            self.cache = SemanticCache(
+                config.cache_dir, embed_fn=getattr(self.llm_engine, "embed", None)
+            )
+            self.tool_cache = ToolResultCache(
+                os.path.join(config.cache_dir, "tool_cache")
+            )
+            logger.debug("Response cache enabled at: %s", config.cache_dir)
+
+        max_concurrent_tools = config.max_concurrent_tools or int(
+            os.getenv("TOOL_CONCURRENCY_LIMIT", "8")
+        )
 
         # Initialize components
         logger.debug("Initializing components...")
@@ -48,21 +95,25 @@ class IntentusAgent:
             llm_engine=config.llm_engine,
             verbose=config.verbose,
             config_path=config.config_path,
+            max_concurrent_tools=max_concurrent_tools,
         )
         logger.debug("Initializer created")
 
         # Get toolbox metadata and available tools
         self.toolbox_metadata = self.initializer.toolbox_metadata
         self.available_tools = self.initializer.available_tools
-        logger.debug(f"Available tools: {self.available_tools}")
-        logger.debug(f"Toolbox metadata: {json.dumps(self.toolbox_metadata, indent=2)}")
+        logger.debug("Available tools: %s", self.available_tools)
+        logger.debug("Toolbox metadata: %s", lazy_json(self.toolbox_metadata))
 
         # Initialize planner with new interface
         self.planner = Planner(
             llm_engine_name=config.llm_engine,
             toolbox_metadata=self.toolbox_metadata,
             available_tools=self.available_tools,
+            toolbox_metadata_json=self.initializer.toolbox_metadata_json,
             verbose=config.verbose,
+            cache=self.cache,
+            throttle=self.throttle,
         )
         logger.debug("Planner created")
 
@@ -73,101 +124,504 @@ class IntentusAgent:
             llm_engine=config.llm_engine,
             toolbox_metadata=self.toolbox_metadata,
             available_tools=self.available_tools,
+            toolbox_metadata_json=self.initializer.toolbox_metadata_json,
             verbose=config.verbose,
+            cache=self.cache,
+            throttle=self.throttle,
+            tool_cache=self.tool_cache,
+            max_concurrent_tools=max_concurrent_tools,
+            tool_instances=self.initializer.tool_instances,
+            tool_module_names=self.initializer.tool_module_names,
         )
         logger.debug("Executor created")
 
-    async def run(self, question: str, image: str = None) -> Dict[str, Any]:
-        """Run the agent on a task."""
-        logger.debug(f"Starting agent run with question: {question}")
-        logger.debug(f"Image provided: {image}")
-        start_time = time.time()
-
-        # Step 1: Analyze the query
-        logger.debug("Step 1: Analyzing query...")
-        query_analysis = await self.planner.analyze_query(question, image)
-        logger.debug(f"Query analysis result: {query_analysis}")
-
-        # Step 2: Generate base response
-        logger.debug("Step 2: Generating base response...")
-        base_response = await self.planner.generate_base_response(question, image)
-        logger.debug(f"Base response: {base_response}")
-
-        # Step 3: Main execution loop
-        logger.debug("Step 3: Starting main execution loop...")
-        step_count = 0
-        while step_count < self.config.max_steps:
-            logger.debug(f"Starting step {step_count + 1} of {self.config.max_steps}")
-
-            # Generate next step
-            logger.debug("Generating next step...")
-            next_step = await self.planner.generate_next_step(
-                question=question,
-                image=image,
-                query_analysis=query_analysis,
-                memory=self.memory,
-                step_count=step_count,
-                max_step_count=self.config.max_steps,
-            )
-            logger.debug(f"Next step generated: {next_step}")
+    async def aclose(self) -> None:
+        """Close the tools and the on-disk caches this agent owns.
+
+        The HTTP clients shared by every agent in the process stay open, see
+        close_shared_clients().
+        """
+        await self.planner.aclose()
+        await self.executor.aclose()
+        if self.cache is not None:
+            self.cache.close()
+        if self.tool_cache is not None:
+            self.tool_cache.close()
+
+    async def close_shared_clients(self) -> None:
+        """Close the process-wide OpenAI client and the tools' shared clients.
+
+        Other agents in the process lose their connections too, so call this
+        only at application shutdown.
+        """
+        from .engine.openai_engine import close_shared_client
+
+        await self.executor.close_tool_clients()
+        await close_shared_client()
+
+    async def __aenter__(self) -> "IntentusAgent":
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb) -> None:
+        await self.aclose()
+
+    @staticmethod
+    async def _within_deadline(awaitable: Any, deadline: Optional[float]) -> Any:
+        """Await ``awaitable``, cancelling it if it runs past ``deadline``.
+
+        Raises:
+            asyncio.TimeoutError: If the deadline is reached first
+        """
+        if deadline is None:
+            return await awaitable
+        timeout = max(0.1, deadline - asyncio.get_running_loop().time())
+        return await asyncio.wait_for(awaitable, timeout=timeout)
+
+    @staticmethod
+    async def _emit_token(on_token: Callable[[str], Any], chunk: str) -> None:
+        """Hand a final output chunk to ``on_token``, awaiting it if needed."""
+        result = on_token(chunk)
+        if inspect.isawaitable(result):
+            await result
+
+    def _planning_memory(self, memory: Memory) -> Any:
+        """Return the view of ``memory`` that planning prompts should see."""
+        if not self.config.memory_window:
+            return memory
+        return memory.windowed(k=self.config.memory_window)
+
+    def _predict_tools(self, query_analysis: Any, k: int) -> List[str]:
+        """Guess the ``k`` tools the coming steps are most likely to use.
+
+        Tools are ranked by how many words of the query analysis also appear
+        in their metadata; tools sharing no word with it are never predicted.
+        """
+        words = set(re.findall(r"[a-z]{3,}", str(query_analysis).lower()))
+        if not words:
+            return []
+        metadata_json = self.initializer.toolbox_metadata_json
+        scores = []
+        for tool in self.available_tools:
+            metadata = str(metadata_json.get(tool, tool)).lower()
+            score = len(words.intersection(re.findall(r"[a-z]{3,}", metadata)))
+            if score:
+                scores.append((score, tool))
+        scores.sort(key=lambda item: item[0], reverse=True)
+        return [tool for _, tool in scores[:k]]
+
+    @staticmethod
+    def _step_dependencies(plan: List[Any], index: int) -> List[int]:
+        """Return the earlier steps that step ``index`` of a plan depends on.
+
+        Invalid dependencies (unknown or later steps) are treated as a
+        dependency on the previous step.
+        """
+        deps = set()
+        for dep in plan[index].depends_on:
+            if not 0 <= dep < index:
+                dep = index - 1
+            if dep >= 0:
+                deps.add(dep)
+        return sorted(deps)
+
+    @classmethod
+    def _plan_waves(cls, plan: List[Any]) -> List[List[int]]:
+        """Group the steps of a plan into waves of mutually independent steps.
+
+        Every step runs in the wave after the last one it depends on, so plans
+        with invalid dependencies degrade to sequential execution.
+        """
+        levels = []
+        for index in range(len(plan)):
+            level = 0
+            for dep in cls._step_dependencies(plan, index):
+                level = max(level, levels[dep] + 1)
+            levels.append(level)
+
+        waves = [[] for _ in range(max(levels) + 1)] if levels else []
+        for index, level in enumerate(levels):
+            waves[level].append(index)
+        return waves
+
+    async def _execute_step(
+        self, context: str, subgoal: str, tool: str, memory: Memory, deadline: Optional[float]
+    ) -> Dict[str, Any]:
+        """Execute one planned step, skipping tools the planner does not know."""
+        if tool not in self.planner.available_tools_set:
+            logger.warning("Planner selected unavailable tool: %s", tool)
+            return {
+                "success": False,
+                "error": f"Tool '{tool}' is not available",
+                "result": None,
+            }
+        logger.debug("Executing step...")
+        return await self._within_deadline(
+            self.executor.execute_step(
+                context=context, subgoal=subgoal, tool=tool, memory=memory
+            ),
+            deadline,
+        )
 
-            # Extract context, subgoal, and tool
-            logger.debug("Extracting context, subgoal, and tool...")
-            context, subgoal, tool = self.planner.extract_context_subgoal_and_tool(
-                next_step
-            )
-            logger.debug(f"Context: {context}")
-            logger.debug(f"Subgoal: {subgoal}")
-            logger.debug(f"Tool: {tool}")
-
-            # Execute the step
-            logger.debug("Executing step...")
-            result = await self.executor.execute_step(
-                context=context, subgoal=subgoal, tool=tool, memory=self.memory
+    async def _execute_plan(
+        self,
+        plan: List[Any],
+        memory: Memory,
+        step_count: int,
+        deadline: Optional[float],
+    ) -> int:
+        """Execute a multi-step plan wave by wave and record it in memory.
+
+        A step's context was written before any step ran, so the results of
+        the steps it depends on are appended to it before it is executed.
+
+        Returns:
+            int: Number of steps executed
+        """
+        results_by_step: Dict[int, Any] = {}
+        for wave in self._plan_waves(plan):
+            logger.debug("Executing plan wave of %s step(s): %s", len(wave), wave)
+            contexts = {}
+            for index in wave:
+                lines = [plan[index].context]
+                deps = self._step_dependencies(plan, index)
+                if deps:
+                    lines.append("Results of the steps this one depends on:")
+                for dep in deps:
+                    lines.append(
+                        f"- Step {step_count + dep} ({plan[dep].tool_name}, "
+                        f"{plan[dep].sub_goal}): {results_by_step[dep]!r}"
+                    )
+                contexts[index] = "\n".join(lines)
+            results = await self._within_deadline(
+                self.executor.execute_steps_parallel(
+                    [
+                        {
+                            "context": contexts[index],
+                            "subgoal": plan[index].sub_goal,
+                            "tool": plan[index].tool_name,
+                        }
+                        for index in wave
+                    ],
+                    memory,
+                ),
+                deadline,
             )
-            logger.debug(f"Step execution result: {result}")
-
-            # Add to memory
-            logger.debug("Adding step to memory...")
-            self.memory.add_action(
-                step_count=step_count,
-                tool_name=tool,
-                sub_goal=subgoal,
-                command=context,
-                result=result,
-            )
-            logger.debug("Step added to memory")
-
-            # Verify if we should stop
-            logger.debug("Verifying if we should stop...")
-            verification = await self.planner.verificate_context(
-                question=question,
-                image=image,
-                query_analysis=query_analysis,
-                memory=self.memory,
+            for index, result in zip(wave, results):
+                logger.debug("Step execution result: %s", result)
+                results_by_step[index] = result
+                memory.add_action(
+                    step_count=step_count + index,
+                    tool_name=plan[index].tool_name,
+                    sub_goal=plan[index].sub_goal,
+                    command=contexts[index],
+                    result=result,
+                )
+
+            if self.config.memory_window:
+                await self._within_deadline(
+                    memory.summarize_older(self.llm_engine, k=self.config.memory_window),
+                    deadline,
+                )
+        return len(plan)
+
+    async def run(
+        self,
+        question: str,
+        image: str = None,
+        on_token: Optional[Callable[[str], Any]] = None,
+    ) -> Dict[str, Any]:
+        """Run the agent on a task.
+
+        Args:
+            question (str): The task or question to solve
+            image (str): Optional path of an image accompanying the question
+            on_token (callable): Called with every chunk of the final output as
+                it arrives; may be a coroutine function
+        """
+        logger.debug("Starting agent run with question: %s", question)
+        logger.debug("Image provided: %s", image)
+        # Each run gets its own memory so concurrent runs stay isolated;
+        # self.memory keeps pointing at the latest one
+        memory = Memory(max_history=self.config.max_history)
+        memory.set_query(question)
+        self.memory = memory
+
+        loop = asyncio.get_running_loop()
+        start_time = loop.time()
+        deadline = start_time + self.config.max_time if self.config.max_time else None
+        # Steps 1-3 share the time budget; running out of it ends the run early
+        query_analysis = None
+        base_response = None
+        step_count = 0
+        # (memory size when launched, task or step) of the next planned step
+        pending_next_step = None
+        timed_out = False
+        try:
+            # Steps 1 and 2: Analyze the query, generate the base response and
+            # plan the first step in a single call
+            logger.debug("Steps 1-2: Analyzing query and generating base response...")
+            try:
+                (
+                    query_analysis,
+                    base_response,
+                    first_step,
+                ) = await self._within_deadline(
+                    self.planner.analyze_and_bootstrap(
+                        question=question,
+                        image=image,
+                        max_step_count=self.config.max_steps,
+                    ),
+                    deadline,
+                )
+                pending_next_step = (0, first_step)
+            except ValueError as e:
+                # Fall back to separate calls; both only depend on the question
+                # and image, so they run concurrently
+                logger.warning(
+                    "Combined analysis failed, falling back to separate calls: %s", e
+                )
+                query_analysis, base_response = await self._within_deadline(
+                    self.planner.bootstrap(question, image), deadline
+                )
+            logger.debug("Query analysis result: %s", query_analysis)
+            logger.debug("Base response: %s", base_response)
+
+            # Warm up the likely tools while the first steps are being planned
+            if self.config.warm_up_tools:
+                tools = self._predict_tools(query_analysis, self.config.warm_up_tools)
+                if pending_next_step is not None:
+                    tools.insert(0, pending_next_step[1].tool_name)
+                self.executor.warm_up_tools(tools)
+
+            # Step 3: Main execution loop
+            logger.debug("Step 3: Starting main execution loop...")
+            while step_count < self.config.max_steps and (
+                deadline is None or loop.time() < deadline
+            ):
+                logger.debug(
+                    "Starting step %s of %s", step_count + 1, self.config.max_steps
+                )
+
+                # Plan several steps at once and run independent ones concurrently
+                plan = None
+                if self.config.plan_ahead > 1 and pending_next_step is None:
+                    try:
+                        plan = await self._within_deadline(
+                            self.planner.generate_step_plan(
+                                question=question,
+                                image=image,
+                                query_analysis=query_analysis,
+                                memory=self._planning_memory(memory),
+                                step_count=step_count,
+                                max_step_count=self.config.max_steps,
+                                k=min(
+                                    self.config.plan_ahead,
+                                    self.config.max_steps - step_count,
+                                ),
+                            ),
+                            deadline,
+                        )
+                    except ValueError as e:
+                        logger.warning(
+                            "Multi-step planning failed, planning a single step: %s", e
+                        )
+                if plan is not None:
+                    executed = await self._execute_plan(
+                        plan, memory, step_count, deadline
+                    )
+                    # Count the plan's last step as the current one
+                    step_count += executed - 1
+
+                    logger.debug("Verifying if we should stop...")
+                    verification = await self._within_deadline(
+                        self.planner.verificate_context(
+                            question=question,
+                            image=image,
+                            query_analysis=query_analysis,
+                            memory=self._planning_memory(memory),
+                        ),
+                        deadline,
+                    )
+                    logger.debug("Verification result: %s", verification)
+                    analysis, conclusion = self.planner.extract_conclusion(verification)
+                    logger.debug("Analysis: %s", analysis)
+                    logger.debug("Conclusion: %s", conclusion)
+                    if conclusion == "STOP":
+                        logger.debug("Stop signal received, breaking execution loop")
+                        break
+                    step_count += 1
+                    continue
+
+                # Generate next step, reusing the speculative plan if memory is unchanged
+                if pending_next_step is not None and pending_next_step[0] == (
+                    memory.action_count
+                ):
+                    logger.debug("Using speculatively generated next step...")
+                    next_step = pending_next_step[1]
+                    if asyncio.isfuture(next_step):
+                        next_step = await self._within_deadline(next_step, deadline)
+                else:
+                    if pending_next_step is not None and asyncio.isfuture(
+                        pending_next_step[1]
+                    ):
+                        pending_next_step[1].cancel()
+                    logger.debug("Generating next step...")
+                    next_step = await self._within_deadline(
+                        self.planner.generate_next_step(
+                            question=question,
+                            image=image,
+                            query_analysis=query_analysis,
+                            memory=self._planning_memory(memory),
+                            step_count=step_count,
+                            max_step_count=self.config.max_steps,
+                        ),
+                        deadline,
+                    )
+                pending_next_step = None
+                logger.debug("Next step generated: %s", next_step)
+
+                # Extract context, subgoal, and tool
+                logger.debug("Extracting context, subgoal, and tool...")
+                context, subgoal, tool = self.planner.extract_context_subgoal_and_tool(
+                    next_step, memory
+                )
+                logger.debug("Context: %s", context)
+                logger.debug("Subgoal: %s", subgoal)
+                logger.debug("Tool: %s", tool)
+
+                # Execute the step
+                result = await self._execute_step(
+                    context, subgoal, tool, memory, deadline
+                )
+                logger.debug("Step execution result: %s", result)
+
+                # Add to memory
+                logger.debug("Adding step to memory...")
+                memory.add_action(
+                    step_count=step_count,
+                    tool_name=tool,
+                    sub_goal=subgoal,
+                    command=context,
+                    result=result,
+                )
+                logger.debug("Step added to memory")
+
+                # Fold actions that left the prompt window into the rolling summary
+                if self.config.memory_window:
+                    await self._within_deadline(
+                        memory.summarize_older(
+                            self.llm_engine, k=self.config.memory_window
+                        ),
+                        deadline,
+                    )
+
+                # Verify if we should stop and plan the next step in a single call
+                logger.debug("Verifying if we should stop...")
+                memory_snapshot = memory.action_count
+                verification = None
+                # With plan_ahead the following steps are planned together instead
+                plan_next_step = (
+                    step_count + 1 < self.config.max_steps
+                    and self.config.plan_ahead <= 1
+                )
+                if plan_next_step:
+                    try:
+                        planned_step, verification = await self._within_deadline(
+                            self.planner.plan_and_verify(
+                                question=question,
+                                image=image,
+                                query_analysis=query_analysis,
+                                memory=self._planning_memory(memory),
+                                step_count=step_count + 1,
+                                max_step_count=self.config.max_steps,
+                            ),
+                            deadline,
+                        )
+                        pending_next_step = (memory_snapshot, planned_step)
+                    except ValueError as e:
+                        logger.warning(
+                            "Combined planning failed, falling back to separate calls: %s",
+                            e,
+                        )
+
+                if verification is None:
+                    # Verify, planning the next step at the same time
+                    verification_task = asyncio.create_task(
+                        self.planner.verificate_context(
+                            question=question,
+                            image=image,
+                            query_analysis=query_analysis,
+                            memory=self._planning_memory(memory),
+                        )
+                    )
+                    speculative_task = None
+                    if plan_next_step:
+                        speculative_task = asyncio.create_task(
+                            self.planner.generate_next_step(
+                                question=question,
+                                image=image,
+                                query_analysis=query_analysis,
+                                memory=self._planning_memory(memory),
+                                step_count=step_count + 1,
+                                max_step_count=self.config.max_steps,
+                            )
+                        )
+
+                    if speculative_task is not None:
+                        # Recorded first, so it is cleaned up if verification fails
+                        pending_next_step = (memory_snapshot, speculative_task)
+                    verification = await self._within_deadline(
+                        verification_task, deadline
+                    )
+                logger.debug("Verification result: %s", verification)
+
+                analysis, conclusion = self.planner.extract_conclusion(verification)
+                logger.debug("Analysis: %s", analysis)
+                logger.debug("Conclusion: %s", conclusion)
+
+                if conclusion == "STOP":
+                    logger.debug("Stop signal received, breaking execution loop")
+                    break
+
+                step_count += 1
+        except asyncio.TimeoutError:
+            logger.warning(
+                "Time budget of %ss exhausted, stopping early", self.config.max_time
             )
-            logger.debug(f"Verification result: {verification}")
-
-            analysis, conclusion = self.planner.extract_conclusion(verification)
-            logger.debug(f"Analysis: {analysis}")
-            logger.debug(f"Conclusion: {conclusion}")
-
-            if conclusion == "STOP":
-                logger.debug("Stop signal received, breaking execution loop")
-                break
-
-            step_count += 1
-
-        # Step 4: Generate final output
-        logger.debug("Step 4: Generating final output...")
-        final_output = await self.planner.generate_final_output(
-            question=question, image=image, memory=self.memory
-        )
-        logger.debug(f"Final output generated: {final_output}")
-
-        end_time = time.time()
+            timed_out = True
+        finally:
+            # However the loop ended (STOP, timeout, step or time limit), a
+            # speculative next step is no longer needed
+            if pending_next_step is not None and asyncio.isfuture(
+                pending_next_step[1]
+            ):
+                pending_next_step[1].cancel()
+                await asyncio.gather(pending_next_step[1], return_exceptions=True)
+        if deadline is not None and loop.time() >= deadline:
+            timed_out = True
+
+        # Step 4: Generate final output, falling back to the base response
+        # when the time budget is already spent
+        if timed_out:
+            logger.debug("Step 4: Out of time, using base response as final output")
+            final_output = base_response
+            if on_token is not None and final_output:
+                await self._emit_token(on_token, final_output)
+        else:
+            logger.debug("Step 4: Generating final output...")
+            chunks = []
+            async for chunk in self.planner.generate_final_output_stream(
+                question=question, image=image, memory=memory
+            ):
+                chunks.append(chunk)
+                if on_token is not None:
+                    await self._emit_token(on_token, chunk)
+            final_output = "".join(chunks)
+        logger.debug("Final output generated: %s", final_output)
+
+        end_time = loop.time()
         execution_time = end_time - start_time
-        logger.debug(f"Total execution time: {execution_time:.2f} seconds")
+        logger.debug("Total execution time: %.2f seconds", execution_time)
 
         result = {
             "query_analysis": query_analysis,
@@ -175,9 +629,9 @@ class IntentusAgent:
             "final_output": final_output,
             "execution_time": execution_time,
             "steps_taken": step_count + 1,
-            "memory": self.memory.get_actions(),
+            "memory": memory.get_actions(),
         }
-        logger.debug(f"Final result: {json.dumps(result, indent=2)}")
+        logger.debug("Final result: %s", lazy_json(result))
         return result
 
 
@@ -199,7 +653,9 @@ def parse_arguments():
     parser = argparse.ArgumentParser(
         description="Run the octotools demo with specified parameters."
     )
-    parser.add_argument("--llm_engine_name", default="gpt-4o", help="LLM engine name.")
+    parser.add_argument(
+        "--llm_engine_name", default="gpt-4.1-mini", help="LLM engine name."
+    )
     parser.add_argument(
         "--output_types",
         default="base,final,direct",
@@ -233,20 +689,36 @@ def parse_arguments():
     return parser.parse_args()
 
 
-def main(args):
-    config = CoreConfig(
+async def run_main(args) -> Dict[str, Any]:
+    config = AgentConfig(
         llm_engine=args.llm_engine_name,
-        enabled_tools=args.enabled_tools,
+        enabled_tools=args.enabled_tools.split(","),
+        verbose=args.verbose,
         cache_dir=args.root_cache_dir,
         max_steps=args.max_steps,
         max_time=args.max_time,
-        max_output_length=args.max_tokens,
     )
-    agent = create_agent(config, verbose=args.verbose)
+
+    def write_token(chunk: str) -> None:
+        sys.stdout.write(chunk)
+        sys.stdout.flush()
 
     # Solve the task or problem
-    result = agent.run("What is the capital of France?")
-    print(f"\nTask Result:\n{json.dumps(result, indent=2)}")
+    async with IntentusAgent(config) as agent:
+        try:
+            return await agent.run(
+                "What is the capital of France?",
+                on_token=write_token if args.verbose else None,
+            )
+        finally:
+            # This process runs a single agent
+            await agent.close_shared_clients()
+
+
+def main(args):
+    install_uvloop()
+    result = asyncio.run(run_main(args))
+    print(f"\nTask Result:\n{lazy_json(result)}")
 
 
 if __name__ == "__main__":
@@ -0,0 +1,253 @@
+import os
+import json
+import math
+import time
+import hashlib
+import inspect
+import logging
+from collections import OrderedDict
+from functools import wraps
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+import diskcache as dc
+
+# Set up logging
+logger = logging.getLogger(__name__)
+
+EmbedFn = Callable[[List[str]], Awaitable[List[List[float]]]]
+
+
+class SemanticCache:
+    """On-disk LLM response cache with exact and near-duplicate lookup.
+
+    Responses are stored in a diskcache (SQLite) store keyed by the SHA-256 of
+    the serialized call, fronted by an in-process LRU of the most recently used
+    ``memory_size`` entries. When an embedding function is supplied, every
+    entry also gets a normalized embedding so that near-duplicate calls
+    (cosine >= ``similarity_threshold``) can reuse a cached response.
+    """
+
+    def __init__(
+        self,
+        root_dir: str,
+        embed_fn: Optional[EmbedFn] = None,
+        similarity_threshold: float = 0.97,
+        memory_size: int = 1024,
+    ):
+        self.root_dir = root_dir
+        self.embed_fn = embed_fn
+        self.similarity_threshold = similarity_threshold
+        self.memory_size = memory_size
+        # key -> (expiry timestamp or None, response), least recently used first
+        self._memory: "OrderedDict[str, Tuple[Optional[float], Any]]" = OrderedDict()
+        self.responses = dc.Cache(os.path.join(root_dir, "responses"))
+        self.embeddings = dc.Cache(os.path.join(root_dir, "embeddings"))
+
+        # Load every stored vector once; lookups scan this list in memory
+        self._index: List[Tuple[str, str, List[float]]] = []
+        for key in self.embeddings.iterkeys():
+            entry = self.embeddings.get(key)
+            if entry is not None:
+                namespace, vector = entry
+                self._index.append((namespace, key, vector))
+        # Embeddings computed on a miss, reused when the response is saved
+        self._pending_vectors: Dict[str, List[float]] = {}
+        logger.debug(
+            "Loaded semantic cache from %s with %s embeddings",
+            root_dir,
+            len(self._index),
+        )
+
+    def key(self, namespace: str, text: str) -> str:
+        return hashlib.sha256(f"{namespace}\n{text}".encode()).hexdigest()
+
+    def _remember(self, key: str, response: Any, expire_at: Optional[float]) -> None:
+        self._memory[key] = (expire_at, response)
+        self._memory.move_to_end(key)
+        if len(self._memory) > self.memory_size:
+            self._memory.popitem(last=False)
+
+    def _recall(self, key: str) -> Optional[Any]:
+        entry = self._memory.get(key)
+        if entry is None:
+            return None
+        expire_at, response = entry
+        if expire_at is not None and expire_at <= time.time():
+            del self._memory[key]
+            return None
+        self._memory.move_to_end(key)
+        return response
+
+    async def _embed(self, text: str) -> Optional[List[float]]:
+        try:
+            vector = (await self.embed_fn([text]))[0]
+        except Exception as e:
+            logger.warning("Embedding failed, skipping semantic lookup: %s", e)
+            return None
+        norm = math.sqrt(sum(x * x for x in vector)) or 1.0
+        return [x / norm for x in vector]
+
+    async def get(
+        self, namespace: str, key: str, text: str, semantic: bool = True
+    ) -> Optional[Any]:
+        """Return a cached response for an exact or, if ``semantic``, near-duplicate call."""
+        response = self._recall(key)
+        if response is not None:
+            logger.debug("Cache hit (memory) for %s", namespace)
+            return response
+
+        response, expire_at = self.responses.get(key, expire_time=True)
+        if response is not None:
+            logger.debug("Cache hit (exact) for %s", namespace)
+            self._remember(key, response, expire_at)
+            return response
+
+        if self.embed_fn is None or not semantic:
+            return None
+
+        vector = await self._embed(text)
+        if vector is None:
+            return None
+        self._pending_vectors[key] = vector
+
+        best_key, best_score = None, -1.0
+        for entry_namespace, entry_key, entry_vector in self._index:
+            if entry_namespace != namespace:
+                continue
+            score = sum(a * b for a, b in zip(vector, entry_vector))
+            if score > best_score:
+                best_key, best_score = entry_key, score
+
+        if best_key is not None and best_score >= self.similarity_threshold:
+            response = self.responses.get(best_key)
+            if response is not None:
+                logger.debug(
+                    "Cache hit (semantic, cosine=%.4f) for %s", best_score, namespace
+                )
+                return response
+
+        logger.debug("Cache miss for %s", namespace)
+        return None
+
+    async def set(
+        self,
+        namespace: str,
+        key: str,
+        text: str,
+        response: Any,
+        ttl: Optional[float] = None,
+        semantic: bool = True,
+    ) -> None:
+        """Store a response and, if enabled and ``semantic``, its embedding."""
+        self.responses.set(key, response, expire=ttl)
+        self._remember(key, response, None if ttl is None else time.time() + ttl)
+
+        if self.embed_fn is None or not semantic:
+            return
+        vector = self._pending_vectors.pop(key, None)
+        if vector is None:
+            vector = await self._embed(text)
+            if vector is None:
+                return
+        self.embeddings.set(key, (namespace, vector), expire=ttl)
+        self._index.append((namespace, key, vector))
+
+    def close(self) -> None:
+        self._memory.clear()
+        self.responses.close()
+        self.embeddings.close()
+
+
+class ToolResultCache:
+    """On-disk cache of tool execution results keyed by (tool, command)."""
+
+    def __init__(self, root_dir: str):
+        self.root_dir = root_dir
+        self.results = dc.Cache(root_dir)
+        logger.debug("Loaded tool result cache from %s", root_dir)
+
+    def key(self, tool: str, command: Any) -> str:
+        payload = json.dumps({"t": tool, "c": command}, sort_keys=True, default=str)
+        return hashlib.sha256(payload.encode()).hexdigest()
+
+    def get(self, key: str) -> Optional[Any]:
+        return self.results.get(key)
+
+    def set(self, key: str, result: Any, ttl: Optional[float] = None) -> None:
+        self.results.set(key, result, expire=ttl)
+
+    def close(self) -> None:
+        self.results.close()
+
+
+def _serialize_call(method: Callable, args: tuple, kwargs: dict) -> Tuple[str, str]:
+    """Serialize a method call into stable strings used as the cache key.
+
+    Returns the static arguments and, separately, the actions of any memory
+    argument, so near-duplicate lookups compare only the static part while
+    an exact memory match is still required.
+    """
+    bound = inspect.signature(method).bind(*args, **kwargs)
+    bound.apply_defaults()
+    arguments = {}
+    actions = {}
+    for name, value in list(bound.arguments.items())[1:]:  # skip self
+        if hasattr(value, "get_actions_text"):
+            # Rendered once per new action, unlike a fresh dump of every action
+            actions[name] = value.get_actions_text()
+        elif hasattr(value, "get_actions"):
+            actions[name] = value.get_actions()
+        else:
+            arguments[name] = value
+    memory_text = json.dumps(actions, sort_keys=True, default=str) if actions else ""
+    return json.dumps(arguments, sort_keys=True, default=str), memory_text
+
+
+def call_cache_key(
+    cache: SemanticCache, method: Callable, args: tuple, kwargs: dict
+) -> Tuple[str, str, str]:
+    """Return the (namespace, key, text) a ``cached`` method call is stored under."""
+    namespace = method.__qualname__
+    text, memory_text = _serialize_call(method, args, kwargs)
+    if memory_text:
+        # Calls only match others made with exactly the same memory
+        digest = hashlib.blake2b(memory_text.encode(), digest_size=16).hexdigest()
+        namespace = f"{namespace}:{digest}"
+    return namespace, cache.key(namespace, text), text
+
+
+def cached(ttl: Optional[float] = None, semantic: bool = True):
+    """Cache the result of an async planner/executor method in ``self.cache``.
+
+    The wrapped method is called as usual when the instance has no cache.
+
+    Args:
+        ttl (float): Seconds before a cached response expires (None keeps it forever)
+        semantic (bool): Whether near-duplicate calls may reuse a response; turn
+            off for methods whose arguments differ little in text but a lot in meaning
+    """
+
+    def decorator(method):
+        @wraps(method)
+        async def wrapper(self, *args, **kwargs):
+            cache = getattr(self, "cache", None)
+            if cache is None:
+                return await method(self, *args, **kwargs)
+
+            namespace, key, text = call_cache_key(
+                cache, method, (self,) + args, kwargs
+            )
+            response = await cache.get(namespace, key, text, semantic=semantic)
+            if response is not None:
+                return response
+
+            response = await method(self, *args, **kwargs)
+            if response is not None:
+                await cache.set(
+                    namespace, key, text, response, ttl=ttl, semantic=semantic
+                )
+            return response
+
+        return wrapper
+
+    return decorator
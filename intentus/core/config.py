@@ -2,6 +2,8 @@ from typing import Dict, Any, List, Optional
 from dataclasses import dataclass, field
 from pathlib import Path
 
+from .utils import ensure_dir
+
 
 @dataclass
 class CoreConfig:
@@ -28,11 +30,12 @@ class CoreConfig:
     verbose: bool = True
     log_level: str = "DEBUG"
 
-    def __post_init__(self):
-        # Only create cache directory if caching is enabled
-        if self.use_cache and self.cache_dir is not None:
-            self.cache_dir.mkdir(parents=True, exist_ok=True)
+    def ensure_cache_dir(self) -> Optional[str]:
+        """Create the cache directory on first use and return its path.
 
-        # Ensure tools directory exists
-        if not self.tools_dir.exists():
-            raise ValueError(f"Tools directory not found: {self.tools_dir}")
+        Returns:
+            Optional[str]: The cache directory, or None when caching is disabled
+        """
+        if not self.use_cache or self.cache_dir is None:
+            return None
+        return ensure_dir(self.cache_dir)
@@ -85,7 +85,8 @@ class ChatAnthropic(EngineLM, CachedEngine):
         sys_prompt_arg = system_prompt if system_prompt else self.system_prompt
 
         if self.use_cache:
-            cache_or_none = self._check_cache(sys_prompt_arg + prompt)
+            cache_key = self._hash_prompt(sys_prompt_arg + prompt)
+            cache_or_none = self._check_cache(cache_key)
             if cache_or_none is not None:
                 return cache_or_none
 
@@ -105,7 +106,7 @@ class ChatAnthropic(EngineLM, CachedEngine):
 
         response = response.content[0].text
         if self.use_cache:
-            self._save_cache(sys_prompt_arg + prompt, response)
+            self._save_cache(cache_key, response)
         return response
 
     def _format_content(self, content: List[Union[str, bytes]]) -> List[dict]:
@@ -144,7 +145,9 @@ class ChatAnthropic(EngineLM, CachedEngine):
         formatted_content = self._format_content(content)
 
         if self.use_cache:
-            cache_key = sys_prompt_arg + json.dumps(formatted_content)
+            cache_key = self._hash_prompt(
+                sys_prompt_arg + json.dumps(formatted_content)
+            )
             cache_or_none = self._check_cache(cache_key)
             if cache_or_none is not None:
                 return cache_or_none
@@ -26,18 +26,20 @@ class CachedEngine:
         else:
             self.cache = None
 
-    def _hash_prompt(self, prompt: str):
-        return hashlib.sha256(f"{prompt}".encode()).hexdigest()
-
-    def _check_cache(self, prompt: str):
-        if self.cache is not None and prompt in self.cache:
-            return self.cache[prompt]
-        else:
+    def _hash_prompt(self, prompt: str) -> bytes:
+        # A short non-cryptographic-strength digest is plenty for a cache key
+        return hashlib.blake2b(prompt.encode(), digest_size=16).digest()
+
+    # Callers hash the prompt once with _hash_prompt() and pass the digest to
+    # both _check_cache() and _save_cache()
+    def _check_cache(self, key: bytes):
+        if self.cache is None:
             return None
+        return self.cache.get(key)
 
-    def _save_cache(self, prompt: str, response: str):
+    def _save_cache(self, key: bytes, response: str):
         if self.cache is not None:
-            self.cache[prompt] = response
+            self.cache[key] = response
 
     def __getstate__(self):
         # Remove the cache from the state before pickling
@@ -1,31 +1,62 @@
-from typing import Any, List, Optional, Dict, Union
+from typing import Any, List, Optional, Dict, Tuple, Union
 from ..config import CoreConfig
+from ..throttle import DualTokenBucket
 from openai import AsyncOpenAI
 import os
+import weakref
 from dotenv import load_dotenv
 
 # Load environment variables
 load_dotenv()
 
+# Engines created from a plain engine name, keyed by (name, throttle, client).
+# Weak values, so an engine (and its throttle) goes away with the last agent using it
+_engine_cache: "weakref.WeakValueDictionary[Tuple[str, Any, Any], Any]" = (
+    weakref.WeakValueDictionary()
+)
 
-def create_llm_engine(config: Union[str, CoreConfig]) -> Any:
-    """Create an LLM engine based on the configuration."""
+
+def create_llm_engine(
+    config: Union[str, CoreConfig],
+    throttle: Optional[DualTokenBucket] = None,
+    client: Optional[AsyncOpenAI] = None,
+) -> Any:
+    """Create an LLM engine based on the configuration.
+
+    Args:
+        config: Engine name or full configuration
+        throttle: Optional rate limiter shared by every engine of an agent
+        client: Optional OpenAI client shared by every engine of an agent
+
+    Engines requested by name are created once per (name, throttle, client)
+    and shared while anything still uses them, so an agent's planner and
+    executor reuse the same engine (for vLLM, the same loaded model). Full
+    configurations always get a new engine.
+    """
     # If config is a string, create a basic CoreConfig
     if isinstance(config, str):
-        config = CoreConfig(llm_engine=config)
+        key = (config, throttle, client)
+        engine = _engine_cache.get(key)
+        if engine is None:
+            engine = _engine_cache[key] = create_llm_engine(
+                CoreConfig(llm_engine=config), throttle=throttle, client=client
+            )
+        return engine
 
     if config.llm_engine == "gpt-4.1-mini":
         from .openai_engine import OpenAIEngine
 
-        return OpenAIEngine(
+        engine = OpenAIEngine(
             model=config.llm_engine,
             temperature=config.temperature,
             model_params=config.model_params,
+            throttle=throttle,
+            client=client,
         )
     elif config.llm_engine == "vllm":
         from .vllm_engine import VLLMEngine
 
-        return VLLMEngine(
+        engine = VLLMEngine(
             model=config.llm_engine,
             temperature=config.temperature,
             model_params=config.model_params,
@@ -33,6 +64,20 @@ def create_llm_engine(config: Union[str, CoreConfig]) -> Any:
     else:
         raise ValueError(f"Unsupported LLM engine: {config.llm_engine}")
 
+    # Serve exact and near-duplicate prompts from disk when caching is enabled
+    cache_dir = config.ensure_cache_dir()
+    if cache_dir is not None:
+        from ..cache import SemanticCache
+        from .semantic_cache_engine import SemanticCacheEngine
+
+        cache = SemanticCache(
+            os.path.join(cache_dir, "engine"),
+            embed_fn=getattr(engine, "embed", None),
+        )
+        engine = SemanticCacheEngine(engine, cache)
+
+    return engine
+
 
 class MockLLMEngine:
     """Mock LLM engine for development."""
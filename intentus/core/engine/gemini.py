@@ -91,7 +91,8 @@ class ChatGemini(EngineLM, CachedEngine):
         sys_prompt_arg = system_prompt if system_prompt else self.system_prompt
 
         if self.use_cache:
-            cache_or_none = self._check_cache(sys_prompt_arg + prompt)
+            cache_key = self._hash_prompt(sys_prompt_arg + prompt)
+            cache_or_none = self._check_cache(cache_key)
             if cache_or_none is not None:
                 return cache_or_none
 
@@ -111,7 +112,7 @@ class ChatGemini(EngineLM, CachedEngine):
         response_text = response.text
 
         if self.use_cache:
-            self._save_cache(sys_prompt_arg + prompt, response_text)
+            self._save_cache(cache_key, response_text)
         return response_text
 
     def _format_content(self, content: List[Union[str, bytes]]) -> List[dict]:
@@ -139,7 +140,9 @@ class ChatGemini(EngineLM, CachedEngine):
         formatted_content = self._format_content(content)
 
         if self.use_cache:
-            cache_key = sys_prompt_arg + json.dumps(formatted_content)
+            cache_key = self._hash_prompt(
+                sys_prompt_arg + json.dumps(formatted_content)
+            )
             cache_or_none = self._check_cache(cache_key)
             if cache_or_none is not None:
                 return cache_or_none
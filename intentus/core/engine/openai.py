@@ -178,7 +178,7 @@ class ChatOpenAI(EngineLM, CachedEngine):
         sys_prompt_arg = system_prompt if system_prompt else self.system_prompt
 
         if self.use_cache:
-            cache_key = sys_prompt_arg + prompt
+            cache_key = self._hash_prompt(sys_prompt_arg + prompt)
             cache_or_none = self._check_cache(cache_key)
             if cache_or_none is not None:
                 return cache_or_none
@@ -286,7 +286,9 @@ class ChatOpenAI(EngineLM, CachedEngine):
         formatted_content = self._format_content(content)
 
         if self.use_cache:
-            cache_key = sys_prompt_arg + json.dumps(formatted_content)
+            cache_key = self._hash_prompt(
+                sys_prompt_arg + json.dumps(formatted_content)
+            )
             cache_or_none = self._check_cache(cache_key)
             if cache_or_none is not None:
                 return cache_or_none
@@ -1,6 +1,54 @@
 import os
-from typing import Any, Dict, List, Optional
+import json
+import asyncio
+import hashlib
+from typing import Any, AsyncIterator, Dict, List, Optional, Type, Union
+
+import httpx
 from openai import AsyncOpenAI
+from pydantic import BaseModel
+
+from ..throttle import DualTokenBucket, estimate_tokens
+
+# Process-wide client shared by every OpenAIEngine, and the loop it was made in
+_shared_client: Optional[AsyncOpenAI] = None
+_shared_client_loop: Optional[asyncio.AbstractEventLoop] = None
+
+
+def _get_client() -> AsyncOpenAI:
+    """Return the shared OpenAI client, creating it on first use.
+
+    Pooled connections belong to one event loop, so the client is rebuilt when
+    it is first used from a different running loop.
+    """
+    global _shared_client, _shared_client_loop
+    try:
+        loop = asyncio.get_running_loop()
+    except RuntimeError:
+        loop = None
+
+    if _shared_client is not None and _shared_client_loop is None:
+        _shared_client_loop = loop
+    if _shared_client is None or (loop is not None and loop is not _shared_client_loop):
+        _shared_client = AsyncOpenAI(
+            api_key=os.getenv("OPENAI_API_KEY"),
+            http_client=httpx.AsyncClient(
+                http2=True,
+                limits=httpx.Limits(max_connections=100, max_keepalive_connections=50),
+                timeout=httpx.Timeout(60.0, connect=5.0),
+            ),
+        )
+        _shared_client_loop = loop
+    return _shared_client
+
+
+async def close_shared_client() -> None:
+    """Close the shared OpenAI client, e.g. on application shutdown."""
+    global _shared_client, _shared_client_loop
+    if _shared_client is not None:
+        await _shared_client.close()
+    _shared_client = None
+    _shared_client_loop = None
 
 
 class OpenAIEngine:
@@ -11,29 +59,124 @@ class OpenAIEngine:
         model: str,
         temperature: float = 0.7,
         model_params: Optional[Dict[str, Any]] = None,
+        throttle: Optional[DualTokenBucket] = None,
+        client: Optional[AsyncOpenAI] = None,
     ):
         """Initialize the OpenAI engine."""
         self.model = model
         self.temperature = temperature
         self.model_params = model_params or {}
+        self.throttle = throttle
+        # Requests currently awaiting a response, keyed by _request_key(),
+        # and how many callers are waiting on each
+        self._inflight: Dict[bytes, asyncio.Future] = {}
+        self._waiters: Dict[bytes, int] = {}
 
-        # Initialize OpenAI client
-        api_key = os.getenv("OPENAI_API_KEY")
-        if not api_key:
+        # An explicitly given client wins over the process-wide shared one
+        self._client = client
+        if client is None and not os.getenv("OPENAI_API_KEY"):
             raise ValueError("OPENAI_API_KEY environment variable is not set")
-        self.client = AsyncOpenAI(api_key=api_key)
+
+    @property
+    def client(self) -> AsyncOpenAI:
+        return self._client if self._client is not None else _get_client()
+
+    async def aclose(self) -> None:
+        """Release what this engine owns, which is nothing.
+
+        An explicitly given client belongs to the caller, and the shared client
+        serves every engine in the process, so closing it here would abort
+        their requests too. Call close_shared_client() at application shutdown.
+        """
+
+    @staticmethod
+    def _request_key(
+        prompt: str,
+        response_format: Union[Dict[str, Any], Type[BaseModel], None],
+        system_prompt: Optional[str],
+    ) -> bytes:
+        payload = json.dumps(
+            [system_prompt, prompt, response_format], sort_keys=True, default=str
+        )
+        return hashlib.blake2b(payload.encode(), digest_size=16).digest()
 
     async def __call__(
-        self, prompt: str, response_format: Optional[Dict[str, Any]] = None
+        self,
+        prompt: str,
+        response_format: Union[Dict[str, Any], Type[BaseModel], None] = None,
+        system_prompt: Optional[str] = None,
+    ) -> Any:
+        """Generate a response from the LLM.
+
+        A ``system_prompt`` is sent first, so keeping it byte-identical across
+        calls lets OpenAI's automatic prefix caching reuse it. Identical
+        requests made while one is still in flight share its response. When
+        ``response_format`` is a pydantic model, the parsed instance is returned.
+        """
+        key = self._request_key(prompt, response_format, system_prompt)
+        request = self._inflight.get(key)
+        if request is None:
+            request = asyncio.ensure_future(
+                self._generate(prompt, response_format, system_prompt)
+            )
+            self._inflight[key] = request
+            request.add_done_callback(lambda done: self._forget(key, done))
+        self._waiters[key] = self._waiters.get(key, 0) + 1
+        try:
+            # Shielded so that one cancelled caller does not cancel the others
+            return await asyncio.shield(request)
+        finally:
+            self._waiters[key] -= 1
+            if not self._waiters[key]:
+                del self._waiters[key]
+                if not request.done():
+                    # The last caller gave up, so stop spending tokens on it
+                    self._forget(key, request)
+                    request.cancel()
+
+    def _forget(self, key: bytes, request: asyncio.Future) -> None:
+        if self._inflight.get(key) is request:
+            del self._inflight[key]
+
+    async def _generate(
+        self,
+        prompt: str,
+        response_format: Union[Dict[str, Any], Type[BaseModel], None],
+        system_prompt: Optional[str],
     ) -> Any:
-        """Generate a response from the LLM."""
+        if self.throttle is not None:
+            await self.throttle.acquire(
+                estimate_tokens((system_prompt or "") + prompt, self.model)
+            )
+
         try:
             # Create message with proper content structure
-            message = {"role": "user", "content": [{"type": "text", "text": prompt}]}
+            messages = []
+            if system_prompt:
+                messages.append({"role": "system", "content": system_prompt})
+            messages.append(
+                {"role": "user", "content": [{"type": "text", "text": prompt}]}
+            )
+
+            # Pydantic models are parsed by the SDK and returned as instances
+            if isinstance(response_format, type) and issubclass(
+                response_format, BaseModel
+            ):
+                response = await self.client.beta.chat.completions.parse(
+                    model=self.model,
+                    messages=messages,
+                    temperature=self.temperature,
+                    response_format=response_format,
+                    **self.model_params,
+                )
+                message = response.choices[0].message
+                if message.parsed is None:
+                    raise ValueError(message.refusal or "Empty structured response")
+                return message.parsed
 
             response = await self.client.chat.completions.create(
                 model=self.model,
-                messages=[message],
+                messages=messages,
                 temperature=self.temperature,
                 response_format=response_format,
                 **self.model_params,
@@ -41,3 +184,82 @@ class OpenAIEngine:
             return response.choices[0].message.content
         except Exception as e:
             raise Exception(f"Error generating response from OpenAI: {str(e)}")
+
+    async def batch(
+        self,
+        prompts: List[str],
+        response_format: Union[Dict[str, Any], Type[BaseModel], None] = None,
+        system_prompt: Optional[str] = None,
+    ) -> List[Any]:
+        """Generate responses for several prompts sharing one format and system prompt.
+
+        The requests are sent concurrently over the shared HTTP/2 connection
+        pool. A failed prompt yields its exception in place of the response.
+        """
+        return await asyncio.gather(
+            *[
+                self(
+                    prompt,
+                    response_format=response_format,
+                    system_prompt=system_prompt,
+                )
+                for prompt in prompts
+            ],
+            return_exceptions=True,
+        )
+
+    async def stream(
+        self,
+        prompt: str,
+        system_prompt: Optional[str] = None,
+        response_format: Optional[Dict[str, Any]] = None,
+    ) -> AsyncIterator[str]:
+        """Stream a response from the LLM chunk by chunk.
+
+        Closing the iterator early also closes the underlying HTTP stream.
+        """
+        if self.throttle is not None:
+            await self.throttle.acquire(
+                estimate_tokens((system_prompt or "") + prompt, self.model)
+            )
+
+        messages = []
+        if system_prompt:
+            messages.append({"role": "system", "content": system_prompt})
+        messages.append({"role": "user", "content": [{"type": "text", "text": prompt}]})
+
+        try:
+            response = await self.client.chat.completions.create(
+                model=self.model,
+                messages=messages,
+                temperature=self.temperature,
+                response_format=response_format,
+                stream=True,
+                **self.model_params,
+            )
+        except Exception as e:
+            raise Exception(f"Error streaming response from OpenAI: {str(e)}")
+
+        try:
+            async for chunk in response:
+                if chunk.choices and chunk.choices[0].delta.content:
+                    yield chunk.choices[0].delta.content
+        except Exception as e:
+            raise Exception(f"Error streaming response from OpenAI: {str(e)}")
+        finally:
+            await response.close()
+
+    async def embed(
+        self, texts: List[str], model: str = "text-embedding-3-small"
+    ) -> List[List[float]]:
+        """Embed a batch of texts in a single request."""
+        if self.throttle is not None:
+            await self.throttle.acquire(
+                sum(estimate_tokens(text, model) for text in texts)
+            )
+
+        try:
+            response = await self.client.embeddings.create(model=model, input=texts)
+            return [item.embedding for item in response.data]
+        except Exception as e:
+            raise Exception(f"Error generating embeddings from OpenAI: {str(e)}")
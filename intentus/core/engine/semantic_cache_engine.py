@@ -0,0 +1,91 @@
+import asyncio
+import hashlib
+import logging
+from typing import Any, List, Optional
+
+from ..cache import SemanticCache
+
+# Set up logging
+logger = logging.getLogger(__name__)
+
+
+class SemanticCacheEngine:
+    """Engine wrapper that serves exact and near-duplicate prompts from a cache.
+
+    Responses are looked up in a SemanticCache before the wrapped engine is
+    called. Prompts with different response formats or system prompts never
+    share entries, and only the prompt itself is compared for similarity.
+    """
+
+    def __init__(
+        self,
+        engine: Any,
+        cache: SemanticCache,
+        ttl: Optional[float] = None,
+    ):
+        self.engine = engine
+        self.cache = cache
+        self.ttl = ttl
+
+    def _namespace(self, response_format: Any, system_prompt: Optional[str]) -> str:
+        schema_name = None
+        if isinstance(response_format, dict):
+            schema_name = response_format.get("json_schema", {}).get("name")
+        elif isinstance(response_format, type):
+            schema_name = response_format.__name__
+        model = getattr(self.engine, "model", type(self.engine).__name__)
+        namespace = f"{model}:{schema_name or 'text'}"
+        if system_prompt:
+            # Only calls with the same system prompt may share entries
+            digest = hashlib.blake2b(system_prompt.encode(), digest_size=16).hexdigest()
+            namespace = f"{namespace}:{digest}"
+        return namespace
+
+    async def __call__(
+        self,
+        prompt: str,
+        response_format: Any = None,
+        system_prompt: Optional[str] = None,
+    ) -> Any:
+        """Generate a response, reusing a cached one when possible."""
+        # The long, static system prompt is kept out of the compared text, or
+        # it would make every prompt look alike to the embedding
+        namespace = self._namespace(response_format, system_prompt)
+        key = self.cache.key(namespace, prompt)
+
+        response = await self.cache.get(namespace, key, prompt)
+        if response is not None:
+            return response
+
+        kwargs = {"response_format": response_format}
+        if system_prompt is not None:
+            kwargs["system_prompt"] = system_prompt
+        response = await self.engine(prompt, **kwargs)
+        if response is not None:
+            await self.cache.set(namespace, key, prompt, response, ttl=self.ttl)
+        return response
+
+    async def batch(
+        self,
+        prompts: List[str],
+        response_format: Any = None,
+        system_prompt: Optional[str] = None,
+    ) -> List[Any]:
+        """Generate responses for several prompts, each going through the cache."""
+        return await asyncio.gather(
+            *[
+                self(
+                    prompt,
+                    response_format=response_format,
+                    system_prompt=system_prompt,
+                )
+                for prompt in prompts
+            ],
+            return_exceptions=True,
+        )
+
+    def __getattr__(self, name: str) -> Any:
+        # Expose stream(), embed() and the other attributes of the wrapped engine
+        if name == "engine":
+            raise AttributeError(name)
+        return getattr(self.engine, name)
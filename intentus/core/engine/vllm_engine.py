@@ -1,6 +1,10 @@
 import os
+import uuid
+import asyncio
 from typing import Any, Dict, List, Optional
+from pydantic import BaseModel
 from vllm import AsyncLLMEngine, SamplingParams
+from vllm.sampling_params import GuidedDecodingParams
 
 
 class VLLMEngine:
@@ -22,20 +26,67 @@ class VLLMEngine:
         # Initialize VLLM engine
         self.engine = AsyncLLMEngine(model=model, **self.model_params)
 
+    @staticmethod
+    def _guided_decoding(response_format: Any) -> Optional[GuidedDecodingParams]:
+        """Translate an OpenAI-style response format into a JSON grammar."""
+        if isinstance(response_format, type) and issubclass(response_format, BaseModel):
+            return GuidedDecodingParams(json=response_format.model_json_schema())
+        if isinstance(response_format, dict) and "json_schema" in response_format:
+            return GuidedDecodingParams(json=response_format["json_schema"]["schema"])
+        return None
+
     async def __call__(
-        self, prompt: str, response_format: Optional[Dict[str, Any]] = None
+        self,
+        prompt: str,
+        response_format: Optional[Dict[str, Any]] = None,
+        system_prompt: Optional[str] = None,
     ) -> Any:
         """Generate a response from the LLM."""
+        if system_prompt:
+            # Keep the static prefix first so vLLM's prefix cache can reuse it
+            prompt = system_prompt + prompt
         try:
-            # Create sampling parameters
+            # Create sampling parameters; a response format constrains decoding
+            # to its JSON schema so the output always parses
             sampling_params = SamplingParams(
-                temperature=self.temperature, max_tokens=self.max_tokens
+                temperature=self.temperature,
+                max_tokens=self.max_tokens,
+                guided_decoding=self._guided_decoding(response_format),
             )
 
-            # Generate response
-            outputs = await self.engine.generate(prompt, sampling_params)
+            # generate() yields cumulative outputs; a unique request id lets
+            # concurrent calls share the engine's continuous batches
+            final_output = None
+            async for output in self.engine.generate(
+                prompt, sampling_params, request_id=uuid.uuid4().hex
+            ):
+                final_output = output
 
             # Extract and return the generated text
-            return outputs[0].outputs[0].text
+            return final_output.outputs[0].text
         except Exception as e:
             raise Exception(f"Error generating response from VLLM: {str(e)}")
+
+    async def batch(
+        self,
+        prompts: List[str],
+        response_format: Optional[Dict[str, Any]] = None,
+        system_prompt: Optional[str] = None,
+    ) -> List[Any]:
+        """Generate responses for several prompts sharing one format and system prompt.
+
+        All prompts are submitted to the engine at once, so its continuous
+        batcher schedules them together. A failed prompt yields its exception
+        in place of the response.
+        """
+        return await asyncio.gather(
+            *[
+                self(
+                    prompt,
+                    response_format=response_format,
+                    system_prompt=system_prompt,
+                )
+                for prompt in prompts
+            ],
+            return_exceptions=True,
+        )
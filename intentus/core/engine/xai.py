@@ -102,7 +102,8 @@ class ChatGrok(ChatOpenAI):
         sys_prompt_arg = system_prompt if system_prompt else self.system_prompt
 
         if self.use_cache:
-            cache_or_none = self._check_cache(sys_prompt_arg + prompt)
+            cache_key = self._hash_prompt(sys_prompt_arg + prompt)
+            cache_or_none = self._check_cache(cache_key)
             if cache_or_none is not None:
                 return cache_or_none
 
@@ -134,7 +135,7 @@ class ChatGrok(ChatOpenAI):
 
         response_text = response.choices[0].message.content
         if self.use_cache:
-            self._save_cache(sys_prompt_arg + prompt, response_text)
+            self._save_cache(cache_key, response_text)
         return response_text
 
     def _format_content(self, content: List[Union[str, bytes]]) -> List[dict]:
@@ -171,7 +172,9 @@ class ChatGrok(ChatOpenAI):
         formatted_content = self._format_content(content)
 
         if self.use_cache:
-            cache_key = sys_prompt_arg + json.dumps(formatted_content)
+            cache_key = self._hash_prompt(
+                sys_prompt_arg + json.dumps(formatted_content)
+            )
             cache_or_none = self._check_cache(cache_key)
             if cache_or_none is not None:
                 return cache_or_none
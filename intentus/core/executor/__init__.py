@@ -1,14 +1,103 @@
 import os
-import json
+import re
+import sys
+import asyncio
+import importlib
 import logging
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, List, Optional, Tuple, Union
 
+import orjson
+
+from ..cache import SemanticCache, ToolResultCache, cached
+from ..throttle import DualTokenBucket
+from openai import AsyncOpenAI
 from ..engine.factory import create_llm_engine
 from ..memory import Memory
+from ..formatters import ToolCommand
+from ..utils import StreamingFieldExtractor
 
 # Initialize logger
 logger = logging.getLogger(__name__)
 
+# Matches a "Command: ..." line in a plain-text response
+_CMD_RE = re.compile(r"^Command:\s*(.+)$", re.MULTILINE)
+
+# Markdown code fence around a JSON answer, e.g. ```json ... ```
+_JSON_FENCE_RE = re.compile(r"```(?:json)?\s*(.*?)```", re.DOTALL | re.IGNORECASE)
+
+# Comma directly before a closing bracket, which JSON does not allow
+_TRAILING_COMMA_RE = re.compile(r",\s*([}\]])")
+
+
+def _repair_json(text: str) -> Optional[Any]:
+    """Best-effort parse of JSON as LLMs tend to emit it.
+
+    Strips markdown fences, keeps only the first balanced ``{...}`` object and
+    drops trailing commas. Returns None when nothing parseable is found.
+    """
+    fenced = _JSON_FENCE_RE.search(text)
+    if fenced:
+        text = fenced.group(1)
+
+    start = text.find("{")
+    if start == -1:
+        return None
+    depth = 0
+    in_string = False
+    escaped = False
+    end = None
+    for index in range(start, len(text)):
+        char = text[index]
+        if in_string:
+            if escaped:
+                escaped = False
+            elif char == "\\":
+                escaped = True
+            elif char == '"':
+                in_string = False
+        elif char == '"':
+            in_string = True
+        elif char == "{":
+            depth += 1
+        elif char == "}":
+            depth -= 1
+            if depth == 0:
+                end = index + 1
+                break
+    if end is None:
+        return None
+
+    candidate = text[start:end]
+    for attempt in (candidate, _TRAILING_COMMA_RE.sub(r"\1", candidate)):
+        try:
+            return orjson.loads(attempt)
+        except orjson.JSONDecodeError:
+            continue
+    return None
+
+
+# Dynamic part of the command prompt; the static part is pre-rendered per tool
+_TOOL_COMMAND_USER_TEMPLATE = """
+Context: {context}
+Subgoal: {subgoal}
+"""
+
+# Structured output format of the streamed command prompt, shared by every
+# call; non-streaming engines get the equivalent ToolCommand model
+_TOOL_COMMAND_SCHEMA = {
+    "type": "json_schema",
+    "json_schema": {
+        "name": "ToolCommand",
+        "strict": True,
+        "schema": {
+            "type": "object",
+            "properties": {"command": {"type": "string"}},
+            "required": ["command"],
+            "additionalProperties": False,
+        },
+    },
+}
+
 
 class Executor:
     """Executor class for Intentus agent."""
@@ -18,20 +107,72 @@ class Executor:
         llm_engine: str,
         toolbox_metadata: Dict[str, Any],
         available_tools: List[str],
+        toolbox_metadata_json: Optional[Dict[str, str]] = None,
         verbose: bool = True,
+        cache: Optional[SemanticCache] = None,
+        throttle: Optional[DualTokenBucket] = None,
+        client: Optional[AsyncOpenAI] = None,
+        tool_cache: Optional[ToolResultCache] = None,
+        max_concurrent_tools: Optional[int] = None,
+        tool_instances: Optional[Dict[str, Any]] = None,
+        tool_module_names: Optional[Dict[str, str]] = None,
     ):
         """Initialize the executor."""
-        self.llm_engine = create_llm_engine(llm_engine)
+        self.llm_engine = create_llm_engine(
+            llm_engine, throttle=throttle, client=client
+        )
         self.toolbox_metadata = toolbox_metadata
+        if toolbox_metadata_json is None:
+            toolbox_metadata_json = {
+                tool_name: orjson.dumps(
+                    metadata, default=str, option=orjson.OPT_SORT_KEYS
+                ).decode()
+                for tool_name, metadata in toolbox_metadata.items()
+            }
+        self.toolbox_metadata_json = toolbox_metadata_json
+        # Static per-tool prefix of the command prompt, identical on every call
+        self.tool_command_system_prompts = {
+            tool_name: self._build_tool_command_system_prompt(tool_name)
+            for tool_name in toolbox_metadata_json
+        }
         self.available_tools = available_tools
+        self.available_tools_set = frozenset(available_tools)
         self.verbose = verbose
+        self.cache = cache
+        self.tool_cache = tool_cache
+        if max_concurrent_tools is None:
+            max_concurrent_tools = int(os.getenv("TOOL_CONCURRENCY_LIMIT", "8"))
+        self.max_concurrent_tools = max_concurrent_tools
+        self._tool_semaphore = None
+        # Tool instances keyed by tool name, seeded with the ones the
+        # initializer already created and completed on first use
+        self._tool_instances: Dict[str, Any] = {
+            tool_name: instance
+            for tool_name, instance in (tool_instances or {}).items()
+            if getattr(instance, "reusable", True)
+        }
+        # Serializes commands of tools that are not safe to run concurrently
+        self._tool_locks: Dict[str, asyncio.Lock] = {}
+        # Module of each tool as discovered by the initializer
+        self._module_name: Dict[str, str] = dict(tool_module_names or {})
+        # Tool classes resolved so far, so each module is imported only once
+        self._tool_class_cache: Dict[str, type] = {}
+        # Warm-up of each reusable tool, started at most once
+        self._tool_warm_ups: Dict[str, asyncio.Task] = {}
         self.logger = logger
 
+    def _get_tool_semaphore(self) -> asyncio.BoundedSemaphore:
+        """Return the semaphore bounding concurrent tool executions."""
+        # Created lazily so that it belongs to the running event loop
+        if self._tool_semaphore is None:
+            self._tool_semaphore = asyncio.BoundedSemaphore(self.max_concurrent_tools)
+        return self._tool_semaphore
+
     async def execute_step(
         self, context: str, subgoal: str, tool: str, memory: Memory
     ) -> Dict[str, Any]:
         """Execute a single step using the specified tool."""
-        if tool not in self.available_tools:
+        if tool not in self.available_tools_set:
             return {
                 "success": False,
                 "error": f"Tool '{tool}' is not available",
@@ -45,27 +186,43 @@ class Executor:
             )
 
             # Execute command
-            result = await self.execute_tool_command(tool, command)
+            async with self._get_tool_semaphore():
+                result = await self.execute_tool_command(tool, command)
 
             return {"success": True, "command": command, "result": result}
 
         except Exception as e:
             return {"success": False, "error": str(e), "result": None}
 
-    async def generate_tool_command(self, context: str, subgoal: str, tool: str) -> str:
-        """Generate a command for the specified tool."""
-        self.logger.debug(f"Generating command for tool: {tool}")
-        self.logger.debug(f"Context: {context}")
-        self.logger.debug(f"Subgoal: {subgoal}")
-        self.logger.debug(f"Tool metadata: {self.toolbox_metadata[tool]}")
+    async def execute_steps_parallel(
+        self, steps: List[Dict[str, str]], memory: Memory
+    ) -> List[Dict[str, Any]]:
+        """Execute independent steps concurrently.
+
+        Each step is a dict with the ``context``, ``subgoal`` and ``tool``
+        arguments of ``execute_step``. Tool executions share the executor's
+        concurrency limit, and a failing step never affects the others.
+        """
+        results = await asyncio.gather(
+            *[self.execute_step(**step, memory=memory) for step in steps],
+            return_exceptions=True,
+        )
+        return [
+            (
+                {"success": False, "error": str(result), "result": None}
+                if isinstance(result, Exception)
+                else result
+            )
+            for result in results
+        ]
 
-        prompt = f"""
+    def _build_tool_command_system_prompt(self, tool: str) -> str:
+        """Build the static part of the command prompt for a tool."""
+        return f"""
 Task: Generate a command for the {tool} tool based on the given context and subgoal.
 
-Context: {context}
-Subgoal: {subgoal}
 Tool: {tool}
-Tool Metadata: {self.toolbox_metadata[tool]}
+Tool Metadata: {self.toolbox_metadata_json[tool]}
 
 Instructions:
 1. Analyze the context and subgoal carefully.
@@ -73,9 +230,8 @@ Instructions:
 3. Ensure the command follows the tool's requirements and best practices.
 
 Response Format:
-Your response MUST be a JSON object with exactly these fields:
+Output only the command JSON:
 {{
-    "analysis": "Your analysis of how to use the tool",
     "command": "The actual command to execute"
 }}
 
@@ -87,58 +243,240 @@ Rules:
 - DO NOT include any explanatory text outside the JSON object.
 """
 
-        self.logger.debug("Calling LLM engine for command generation")
-        response = await self.llm_engine(
-            prompt,
-            response_format={
-                "type": "json_schema",
-                "json_schema": {
-                    "name": "ToolCommand",
-                    "schema": {
-                        "type": "object",
-                        "properties": {
-                            "analysis": {"type": "string"},
-                            "command": {"type": "string"},
-                        },
-                        "required": ["analysis", "command"],
-                    },
-                },
-            },
-        )
-        self.logger.debug(f"Raw LLM response: {response}")
+    # Exact matches only: the long step context would make different
+    # sub-goals look alike to the embedding
+    @cached(ttl=24 * 60 * 60, semantic=False)
+    async def generate_tool_command(self, context: str, subgoal: str, tool: str) -> str:
+        """Generate a command for the specified tool."""
+        prompt = _TOOL_COMMAND_USER_TEMPLATE.format(context=context, subgoal=subgoal)
+
+        request = None
+        if not hasattr(self.llm_engine, "stream"):
+            # Dispatch the request first so the logging below overlaps the round-trip
+            request = asyncio.ensure_future(
+                self.llm_engine(
+                    prompt,
+                    system_prompt=self.tool_command_system_prompts[tool],
+                    response_format=ToolCommand,
+                )
+            )
+
+        self.logger.debug("Generating command for tool: %s", tool)
+        self.logger.debug("Context: %s", context)
+        self.logger.debug("Subgoal: %s", subgoal)
+        self.logger.debug("Tool metadata: %s", self.toolbox_metadata_json[tool])
 
-        if isinstance(response, dict):
+        if request is None:
+            # Stop reading as soon as the command field is complete
+            self.logger.debug("Streaming LLM engine for command generation")
+            extractor = StreamingFieldExtractor("command")
+            stream = self.llm_engine.stream(
+                prompt,
+                system_prompt=self.tool_command_system_prompts[tool],
+                response_format=_TOOL_COMMAND_SCHEMA,
+            )
+            try:
+                async for chunk in stream:
+                    command = extractor.feed(chunk)
+                    if command is not None and command.strip():
+                        command = command.strip()
+                        self.logger.debug(
+                            "Extracted command from partial response: '%s'", command
+                        )
+                        return command
+            finally:
+                await stream.aclose()
+            response = extractor.text
+        else:
+            self.logger.debug("Calling LLM engine for command generation")
+            response = await request
+        # The raw response can be several KB, skip formatting it unless needed
+        if self.logger.isEnabledFor(logging.DEBUG):
+            self.logger.debug("Raw LLM response: %s", response)
+
+        if isinstance(response, ToolCommand):
+            command = response.command.strip()
+            if not command:
+                raise ValueError("Empty command generated")
+            return command
+        elif isinstance(response, dict):
             command = response.get("command", "").strip()
-            self.logger.debug(f"Extracted command from dict: '{command}'")
+            self.logger.debug("Extracted command from dict: '%s'", command)
             if not command:
                 raise ValueError("Empty command generated")
             return command
         else:
             # Parse the response to extract the command
             self.logger.debug("Response is not dict, parsing as string")
+            text = str(response)
             try:
-                data = json.loads(str(response))
-                command = data.get("command", "").strip()
-                self.logger.debug(f"Extracted command from JSON string: '{command}'")
+                data = orjson.loads(text)
+            except orjson.JSONDecodeError:
+                # Recover from fenced or slightly malformed JSON without a retry
+                data = _repair_json(text)
+            if isinstance(data, dict):
+                command = str(data.get("command", "")).strip()
+                self.logger.debug("Extracted command from JSON string: '%s'", command)
                 if not command:
                     raise ValueError("Empty command generated")
                 return command
-            except json.JSONDecodeError:
-                self.logger.error("Failed to parse response as JSON")
-                raise ValueError("Invalid response format")
+
+            # Engines without structured output may answer in plain text
+            match = _CMD_RE.search(text)
+            command = match.group(1).strip() if match else ""
+            if command:
+                self.logger.debug("Extracted command from text: '%s'", command)
+                return command
+            self.logger.error("Failed to parse response as JSON")
+            raise ValueError("Invalid response format")
+
+    async def generate_tool_commands_batch(
+        self, requests: List[Tuple[str, str, str]]
+    ) -> List[Union[str, Exception]]:
+        """Generate commands for several (context, subgoal, tool) requests at once.
+
+        All requests are in flight concurrently, so the batch takes about as
+        long as its slowest request. A failed request yields its exception in
+        place of the command instead of failing the whole batch.
+        """
+        self.logger.debug("Generating %d commands concurrently", len(requests))
+        return await asyncio.gather(
+            *[
+                self.generate_tool_command(context=context, subgoal=subgoal, tool=tool)
+                for context, subgoal, tool in requests
+            ],
+            return_exceptions=True,
+        )
+
+    def _cached_tool_class(self, tool: str) -> type:
+        """Return the class of a tool, importing its module on first use."""
+        tool_class = self._tool_class_cache.get(tool)
+        if tool_class is None:
+            module_name = self._module_name.get(tool)
+            if module_name is None:
+                # Convert tool name to directory name (e.g., Google_Search_Tool -> google_search)
+                tool_dir = tool.lower().replace("_tool", "")
+                module_name = f"intentus.tools.{tool_dir}.tool"
+                self._module_name[tool] = module_name
+            module = sys.modules.get(module_name) or importlib.import_module(
+                module_name
+            )
+            tool_class = getattr(module, tool)
+            self._tool_class_cache[tool] = tool_class
+        return tool_class
+
+    def _get_tool_instance(self, tool: str) -> Any:
+        """Return the shared instance of a tool, or a fresh one for stateful tools."""
+        tool_instance = self._tool_instances.get(tool)
+        if tool_instance is None:
+            tool_class = self._cached_tool_class(tool)
+            tool_instance = tool_class()
+            # Stateful tools get a fresh instance for every command
+            if getattr(tool_class, "reusable", True):
+                self._tool_instances[tool] = tool_instance
+        return tool_instance
+
+    def warm_up_tools(self, tools: List[str]) -> None:
+        """Start warming up tools in the background, ahead of their first command.
+
+        Only reusable tools are warmed, since stateful ones get a fresh
+        instance per command. Each tool is warmed at most once and failures
+        are only logged; the command itself will surface them.
+        """
+        for tool in tools:
+            if tool in self._tool_warm_ups or tool not in self.available_tools_set:
+                continue
+            try:
+                tool_instance = self._get_tool_instance(tool)
+            except Exception as e:
+                self.logger.debug("Could not load %s for warm-up: %s", tool, e)
+                continue
+            if not getattr(tool_instance, "reusable", True):
+                continue
+            warm_up = getattr(tool_instance, "warm_up", None)
+            if warm_up is None:
+                continue
+            self.logger.debug("Warming up %s", tool)
+            task = asyncio.ensure_future(warm_up())
+            task.add_done_callback(self._log_warm_up_failure)
+            self._tool_warm_ups[tool] = task
+
+    async def aclose(self) -> None:
+        """Close the reusable tool instances, e.g. their network sessions."""
+        for tool, tool_instance in self._tool_instances.items():
+            aclose = getattr(tool_instance, "aclose", None)
+            if aclose is None:
+                continue
+            try:
+                await aclose()
+            except Exception as e:
+                self.logger.debug("Could not close %s: %s", tool, e)
+
+    async def close_tool_clients(self) -> None:
+        """Close the clients the loaded tool classes share process-wide.
+
+        Every executor in the process uses them, so only call this at
+        application shutdown.
+        """
+        for tool_class in {type(instance) for instance in self._tool_instances.values()}:
+            close_client = getattr(tool_class, "close_client", None)
+            if close_client is None:
+                continue
+            try:
+                await close_client()
+            except Exception as e:
+                self.logger.debug("Could not close %s: %s", tool_class.__name__, e)
+
+    def _log_warm_up_failure(self, task: asyncio.Task) -> None:
+        if not task.cancelled() and task.exception() is not None:
+            self.logger.debug("Tool warm-up failed: %s", task.exception())
+
+    async def _wait_for_warm_up(self, tool: str) -> None:
+        """Let a command wait for its tool's warm-up if one is still running."""
+        task = self._tool_warm_ups.get(tool)
+        if (
+            task is not None
+            and not task.done()
+            and task.get_loop() is asyncio.get_running_loop()
+        ):
+            # A failed warm-up is left to the command to run into
+            await asyncio.wait([task])
 
     async def execute_tool_command(self, tool: str, command: str) -> Any:
         """Execute a command using the specified tool."""
-        # Import the tool module
         try:
-            # Convert tool name to directory name (e.g., Google_Search_Tool -> google_search)
-            tool_dir = tool.lower().replace("_tool", "")
-            module = __import__(f"intentus.tools.{tool_dir}.tool", fromlist=["Tool"])
-            tool_class = getattr(module, tool)
-            tool_instance = tool_class()
+            tool_instance = self._get_tool_instance(tool)
+            await self._wait_for_warm_up(tool)
+
+            # Reuse the result of an identical earlier command if the tool allows it
+            use_cache = self.tool_cache is not None and getattr(
+                tool_instance, "cache_results", True
+            )
+            if use_cache:
+                key = self.tool_cache.key(tool, command)
+                cached_result = self.tool_cache.get(key)
+                if cached_result is not None:
+                    self.logger.debug("Tool cache hit for %s", tool)
+                    return cached_result
+                self.logger.debug("Tool cache miss for %s", tool)
 
             # Execute the command
-            result = await tool_instance.execute(command)
+            if getattr(tool_instance, "async_safe", True):
+                result = await tool_instance.execute(command)
+            else:
+                lock = self._tool_locks.setdefault(tool, asyncio.Lock())
+                async with lock:
+                    result = await tool_instance.execute(command)
+
+            # The tool decides which results are worth keeping (failed ones are not)
+            if (
+                use_cache
+                and result is not None
+                and tool_instance.should_cache(result)
+            ):
+                self.tool_cache.set(
+                    key, result, ttl=getattr(tool_instance, "cache_ttl", None)
+                )
             return result
 
         except Exception as e:
@@ -1,3 +1,5 @@
+from typing import List
+
 from pydantic import BaseModel
 
 
@@ -5,7 +7,7 @@ from pydantic import BaseModel
 class QueryAnalysis(BaseModel):
     concise_summary: str
     required_skills: str
-    relevant_tools: str
+    relevant_tools: str = ""  # Not requested by the planner's analysis schema
     additional_considerations: str
 
     def __str__(self):
@@ -23,22 +25,37 @@ Additional Considerations:
 """
 
 
-# Planner: NextStep
+# Planner: NextStep (the tool's context is assembled from memory, see
+# Memory.build_context_for)
 class NextStep(BaseModel):
-    justification: str
+    sub_goal: str
+    tool_name: str
+
+
+# Planner: StepPlan
+class PlannedStep(BaseModel):
     context: str
     sub_goal: str
     tool_name: str
+    depends_on: List[int] = []
+
+
+class StepPlan(BaseModel):
+    steps: List[PlannedStep]
 
 
 # Executor: MemoryVerification
 class MemoryVerification(BaseModel):
     analysis: str
-    stop_signal: bool
+    stop_signal: str
+
+
+# Planner: PlanAndVerify
+class PlanAndVerify(BaseModel):
+    verification: MemoryVerification
+    next_step: NextStep
 
 
 # Executor: ToolCommand
 class ToolCommand(BaseModel):
-    analysis: str
-    explanation: str
     command: str
@@ -1,29 +1,56 @@
 import os
 import sys
+import asyncio
+import hashlib
 import importlib
-import inspect
+import logging
 import traceback
+from concurrent.futures import ThreadPoolExecutor
 from typing import Dict, Any, List, Tuple
-import time
+import threading
+import orjson
+import httpx
+import platformdirs
+from intentus import __version__
+from intentus.tools import base as tools_base
 from intentus.tools.base import BaseTool
 
+# Set up logging
+logger = logging.getLogger(__name__)
+
+# Readiness probe of the vLLM server started by setup_vllm_server()
+VLLM_HEALTH_URL = "http://127.0.0.1:8888/health"
+
+# Tool metadata from earlier runs, one file per tools directory and Python
+# environment. Entries are keyed by tool directory and invalidated by the mtime
+# of its tool.py; the whole file by the package version and tools/base.py.
+TOOLS_METADATA_CACHE_DIR = platformdirs.user_cache_dir("intentus")
+
 
 class Initializer:
+    _path_added = False  # whether the project root was put on sys.path
+
     def __init__(
         self,
         enabled_tools: List[str] = [],
         llm_engine: str = None,
         verbose: bool = False,
         config_path: str = None,
+        max_concurrent_tools: int = 8,
     ):
         self.toolbox_metadata = {}
+        self.toolbox_metadata_json = {}  # tool name -> metadata serialized once
         self.available_tools = []
+        self.tool_instances: Dict[str, BaseTool] = {}  # shared with the executor
+        self._tool_classes: Dict[str, type] = {}  # classes found while loading
+        self.tool_module_names: Dict[str, str] = {}  # tool name -> module path
         self.enabled_tools = enabled_tools
         self.load_all = self.enabled_tools == ["all"]
         self.llm_engine = llm_engine  # llm engine name
         self.verbose = verbose
         self.vllm_server_process = None
         self.config_path = config_path
+        self.max_concurrent_tools = max_concurrent_tools
         print("\n==> Initializing core...")
         print(f"Enabled tools: {self.enabled_tools}")
         print(f"LLM engine name: {self.llm_engine}")
@@ -60,74 +87,217 @@ class Initializer:
         print(f"Project root: {project_root}")
         print(f"Tools directory: {tools_dir}")
 
-        # Add project root to Python path
-        if project_root not in sys.path:
-            sys.path.insert(0, project_root)
-            print(f"Updated Python path: {sys.path}")
+        # Add project root to Python path, once per process; appended so it
+        # does not precede the entries every other import is resolved against
+        if not Initializer._path_added:
+            if project_root not in sys.path:
+                sys.path.append(project_root)
+                print(f"Updated Python path: {sys.path}")
+            Initializer._path_added = True
+
+        metadata_cache = self._load_metadata_cache(tools_dir)
+        cache_changed = False
 
         # Scan tools directory
         tools_metadata = {}
-        for tool_dir in os.listdir(tools_dir):
-            tool_path = os.path.join(tools_dir, tool_dir)
-            if os.path.isdir(tool_path) and not tool_dir.startswith("__"):
-                tool_file = os.path.join(tool_path, "tool.py")
-                if os.path.exists(tool_file):
-                    print(f"\n==> Attempting to import: intentus.tools.{tool_dir}.tool")
-                    try:
-                        module = importlib.import_module(
-                            f"intentus.tools.{tool_dir}.tool"
-                        )
-                        for item_name in dir(module):
-                            item = getattr(module, item_name)
-                            if (
-                                isinstance(item, type)
-                                and issubclass(item, BaseTool)
-                                and item != BaseTool
-                            ):
-                                # Only load enabled tools or all tools if load_all is True
-                                if self.load_all or item_name in self.enabled_tools:
-                                    print(f"Found tool class: {item_name}")
-                                    tool_instance = item()
-                                    metadata = tool_instance.get_metadata()
-                                    tools_metadata[item_name] = metadata
-                                    print(f"Metadata for {item_name}: {metadata}")
-                    except Exception as e:
-                        print(f"Error importing {tool_dir}: {str(e)}")
-                        print("Full traceback:")
-                        print(traceback.format_exc())
+        to_import = []  # (tool_dir, mtime) of modules the cache cannot answer
+        with os.scandir(tools_dir) as entries:
+            for entry in entries:
+                if not entry.is_dir(follow_symlinks=False) or entry.name.startswith(
+                    "__"
+                ):
+                    continue
+                tool_dir = entry.name
+                tool_file = os.path.join(entry.path, "tool.py")
+                try:
+                    mtime = os.stat(tool_file).st_mtime
+                except OSError:
+                    continue
+
+                # Skip the import when the cache knows every enabled tool here
+                cached = metadata_cache.get(tool_dir)
+                if cached is not None and cached.get("mtime") == mtime:
+                    wanted = [
+                        name
+                        for name in cached["classes"]
+                        if self.load_all or name in self.enabled_tools
+                    ]
+                    if all(name in cached["metadata"] for name in wanted):
+                        for name in wanted:
+                            print(f"Found tool class: {name} (cached metadata)")
+                            tools_metadata[name] = cached["metadata"][name]
+                            self.tool_module_names[name] = (
+                                f"intentus.tools.{tool_dir}.tool"
+                            )
+                        continue
+                to_import.append((tool_dir, mtime))
+
+        # Import the remaining modules concurrently; heavy transitive imports
+        # spend much of their time in file I/O and dlopen outside the GIL
+        modules = []
+        if to_import:
+            with ThreadPoolExecutor(max_workers=min(32, len(to_import))) as pool:
+                modules = list(
+                    pool.map(
+                        self._import_tool_module,
+                        [tool_dir for tool_dir, _ in to_import],
+                    )
+                )
+
+        for (tool_dir, mtime), module in zip(to_import, modules):
+            if module is None:
+                continue
+            try:
+                classes = []
+                dir_metadata = {}
+                for item_name, item in self._find_tool_classes(module):
+                    classes.append(item_name)
+                    # Only load enabled tools or all tools if load_all is True
+                    if self.load_all or item_name in self.enabled_tools:
+                        print(f"Found tool class: {item_name}")
+                        self._tool_classes[item_name] = item
+                        self.tool_module_names[item_name] = module.__name__
+                        tool_instance = item()
+                        self.tool_instances[item_name] = tool_instance
+                        metadata = tool_instance.get_metadata()
+                        tools_metadata[item_name] = metadata
+                        dir_metadata[item_name] = metadata
+                        print(f"Metadata for {item_name}: {metadata}")
+                metadata_cache[tool_dir] = {
+                    "mtime": mtime,
+                    "classes": classes,
+                    "metadata": dir_metadata,
+                }
+                cache_changed = True
+            except Exception as e:
+                print(f"Error loading tools from {tool_dir}: {str(e)}")
+                self._report_traceback("Error loading tools from %s", tool_dir)
+
+        if cache_changed:
+            self._save_metadata_cache(tools_dir, metadata_cache)
 
         print(f"\n==> Total number of tools imported: {len(tools_metadata)}")
         return tools_metadata
 
-    def run_demo_commands(self) -> List[str]:
-        print("\n==> Running demo commands for each tool...")
-        self.available_tools = []
+    @staticmethod
+    def _find_tool_classes(module: Any) -> List[Tuple[str, type]]:
+        """Return the (name, class) pairs of the tools a tool module provides."""
+        # Modules name their tool explicitly, which saves scanning the namespace
+        tool_class = getattr(module, "TOOL_CLASS", None)
+        if tool_class is not None:
+            return [(tool_class.__name__, tool_class)]
+        return [
+            (item_name, item)
+            for item_name, item in vars(module).items()
+            if isinstance(item, type)
+            and issubclass(item, BaseTool)
+            and item is not BaseTool
+        ]
 
-        for tool_name, tool_data in self.toolbox_metadata.items():
-            print(f"Checking availability of {tool_name}...")
+    def _import_tool_module(self, tool_dir: str) -> Any:
+        """Import a tool module, returning None (and reporting why) on failure."""
+        print(f"\n==> Attempting to import: intentus.tools.{tool_dir}.tool")
+        try:
+            return importlib.import_module(f"intentus.tools.{tool_dir}.tool")
+        except Exception as e:
+            print(f"Error importing {tool_dir}: {str(e)}")
+            self._report_traceback("Error importing %s", tool_dir)
+            return None
+
+    def _report_traceback(self, message: str, name: str) -> None:
+        """Print the traceback of the exception being handled in verbose mode.
+
+        Otherwise it is only formatted if a DEBUG handler actually emits it,
+        since tools with missing optional dependencies fail here routinely.
+        """
+        if self.verbose:
+            print("Full traceback:")
+            print(traceback.format_exc())
+        else:
+            logger.debug(message, name, exc_info=True)
+
+    @staticmethod
+    def _metadata_cache_path(tools_dir: str) -> str:
+        # Separate checkouts and virtualenvs never serve each other's metadata
+        scope = hashlib.blake2b(
+            f"{os.path.abspath(tools_dir)}\n{sys.prefix}".encode(), digest_size=8
+        ).hexdigest()
+        return os.path.join(TOOLS_METADATA_CACHE_DIR, f"tools_metadata-{scope}.json")
+
+    @staticmethod
+    def _metadata_cache_version() -> List[Any]:
+        # get_metadata() and the tool base class live in tools/base.py
+        return [__version__, os.stat(tools_base.__file__).st_mtime]
+
+    def _load_metadata_cache(self, tools_dir: str) -> Dict[str, Any]:
+        try:
+            with open(self._metadata_cache_path(tools_dir), "rb") as file:
+                cache = orjson.loads(file.read())
+        except (OSError, orjson.JSONDecodeError):
+            return {}
+        if (
+            not isinstance(cache, dict)
+            or cache.get("version") != self._metadata_cache_version()
+        ):
+            return {}
+        return cache.get("tools", {})
+
+    def _save_metadata_cache(
+        self, tools_dir: str, metadata_cache: Dict[str, Any]
+    ) -> None:
+        cache = {"version": self._metadata_cache_version(), "tools": metadata_cache}
+        try:
+            os.makedirs(TOOLS_METADATA_CACHE_DIR, exist_ok=True)
+            with open(self._metadata_cache_path(tools_dir), "wb") as file:
+                file.write(orjson.dumps(cache, default=str))
+        except OSError as e:
+            print(f"Could not save tool metadata cache: {str(e)}")
 
-            try:
-                # Get the tool directory name from the tool name
-                tool_dir = tool_name.lower().replace("_tool", "")
+    def _check_tool_availability(self, tool_name: str) -> bool:
+        print(f"Checking availability of {tool_name}...")
 
-                # Import the tool module
-                module_name = f"intentus.tools.{tool_dir}.tool"
-                module = importlib.import_module(module_name)
+        # Tools instantiated while loading their metadata are known to work
+        if tool_name in self.tool_instances:
+            print(f"Successfully initialized {tool_name}")
+            return True
 
-                # Get the tool class
+        try:
+            # Only tools whose metadata came from the cache still need an import
+            tool_class = self._tool_classes.get(tool_name)
+            if tool_class is None:
+                module = importlib.import_module(self.tool_module_names[tool_name])
                 tool_class = getattr(module, tool_name)
 
-                # Instantiate the tool
-                tool_instance = tool_class()
+            # Instantiate the tool
+            self.tool_instances[tool_name] = tool_class()
 
-                # Add to available tools
-                self.available_tools.append(tool_name)
-                print(f"Successfully initialized {tool_name}")
+            print(f"Successfully initialized {tool_name}")
+            return True
 
-            except Exception as e:
-                print(f"Error checking availability of {tool_name}: {str(e)}")
-                print("Full traceback:")
-                print(traceback.format_exc())
+        except Exception as e:
+            print(f"Error checking availability of {tool_name}: {str(e)}")
+            self._report_traceback("Error checking availability of %s", tool_name)
+            return False
+
+    def run_demo_commands(self) -> List[str]:
+        print("\n==> Running demo commands for each tool...")
+
+        # Tool constructors are synchronous, so instantiate them on a bounded thread pool
+        tool_names = list(self.toolbox_metadata)
+        with ThreadPoolExecutor(
+            max_workers=max(1, min(self.max_concurrent_tools, len(tool_names) or 1))
+        ) as pool:
+            checks = list(pool.map(self._check_tool_availability, tool_names))
+
+        # Add to available tools, keeping the metadata order
+        self.available_tools = [
+            tool_name for tool_name, available in zip(tool_names, checks) if available
+        ]
+        # Drop the unavailable tools in place instead of rebuilding the mappings
+        for tool_name, available in zip(tool_names, checks):
+            if not available:
+                self.tool_instances.pop(tool_name, None)
+                self.tool_module_names.pop(tool_name, None)
 
         print("\n✅ Finished running demo commands for each tool.")
         return self.available_tools
@@ -138,6 +308,15 @@ class Initializer:
         # Load tools and get metadata
         self.toolbox_metadata = self.load_tools_and_get_metadata()
 
+        # Serialize each tool's metadata once, as minified JSON with sorted keys
+        # so the prompts built from it are identical across runs
+        self.toolbox_metadata_json = {
+            tool_name: orjson.dumps(
+                metadata, default=str, option=orjson.OPT_SORT_KEYS
+            ).decode()
+            for tool_name, metadata in self.toolbox_metadata.items()
+        }
+
         # Run demo commands to determine available tools
         self.run_demo_commands()
 
@@ -146,6 +325,18 @@ class Initializer:
         print(f"✅ Final available tools: {self.available_tools}")
 
     def setup_vllm_server(self) -> None:
+        """Start the vLLM server and block until it is ready.
+
+        The server is watched from an event loop on a daemon thread, which
+        keeps draining its output after startup and works whether or not the
+        caller is already running an event loop.
+        """
+        loop = asyncio.new_event_loop()
+        threading.Thread(target=loop.run_forever, daemon=True).start()
+        asyncio.run_coroutine_threadsafe(self.setup_vllm_server_async(), loop).result()
+
+    async def setup_vllm_server_async(self) -> None:
+        """Start the vLLM server and wait until it is ready without blocking the loop."""
         # Check if vllm is installed
         try:
             import vllm
@@ -172,27 +363,51 @@ class Initializer:
                 "8888",
             ]
 
-        import subprocess
-
-        vllm_process = subprocess.Popen(
-            command,
-            stdout=subprocess.PIPE,
-            stderr=subprocess.PIPE,
-            universal_newlines=True,
+        vllm_process = await asyncio.create_subprocess_exec(
+            *command,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE,
         )
+        self.vllm_server_process = vllm_process
+        started = asyncio.Event()
+
+        async def drain(stream, tag):
+            # Keep reading after startup so the server never blocks on a full pipe
+            while True:
+                line = await stream.readline()
+                if not line:
+                    break
+                if started.is_set():
+                    continue
+                line = line.decode(errors="replace").strip()
+                if line != "":
+                    print(f"VLLM server {tag} output:", line)
+                if tag == "standard" and "Server started" in line:
+                    started.set()
+
+        self._vllm_output_tasks = [
+            asyncio.ensure_future(drain(vllm_process.stdout, "standard")),
+            asyncio.ensure_future(drain(vllm_process.stderr, "error")),
+        ]
 
         print("Starting VLLM server...")
-        while True:
-            output = vllm_process.stdout.readline()
-            error = vllm_process.stderr.readline()
-            time.sleep(5)
-            if output.strip() != "":
-                print("VLLM server standard output:", output.strip())
-            if error.strip() != "":
-                print("VLLM server error output:", error.strip())
-            if "Server started" in output:
-                print("VLLM server started successfully!")
-                break
+        async with httpx.AsyncClient(timeout=0.5) as client:
+            while not started.is_set():
+                if vllm_process.returncode is not None:
+                    raise RuntimeError(
+                        f"VLLM server exited with code {vllm_process.returncode}"
+                    )
+                try:
+                    if (await client.get(VLLM_HEALTH_URL)).status_code == 200:
+                        started.set()
+                        break
+                except httpx.HTTPError:
+                    pass
+                try:
+                    await asyncio.wait_for(started.wait(), timeout=0.2)
+                except asyncio.TimeoutError:
+                    pass
+        print("VLLM server started successfully!")
 
 
 if __name__ == "__main__":
@@ -1,13 +1,40 @@
-from typing import Dict, Any, List, Union, Optional
+from collections import deque
+from typing import Deque, Dict, Any, List, Tuple, Union, Optional
 import os
 
 
+class MemoryWindow:
+    """Read-only view over a subset of a Memory's actions, used in prompts."""
+
+    def __init__(
+        self, actions: List[Dict[str, Any]], action_texts: Optional[List[str]] = None
+    ):
+        self.actions = actions
+        self._action_texts = action_texts  # repr() of each action, if known
+
+    def get_actions(self) -> List[Dict[str, Any]]:
+        return self.actions
+
+    def get_actions_text(self) -> str:
+        """Return the actions as they are rendered in prompts."""
+        if self._action_texts is None:
+            return str(self.actions)
+        return "[" + ", ".join(self._action_texts) + "]"
+
+
 class Memory:
 
-    def __init__(self):
+    def __init__(self, max_history: Optional[int] = None):
         self.query: Optional[str] = None
         self.files: List[Dict[str, str]] = []
-        self.actions: Dict[str, Dict[str, Any]] = {}
+        # Only the last max_history actions are kept (all of them when None)
+        self.actions: Deque[Dict[str, Any]] = deque(maxlen=max_history)
+        self.action_count = 0  # Actions ever added, including dropped ones
+        # repr() of each kept action, rendered once when it is added
+        self._action_texts: Deque[str] = deque(maxlen=max_history)
+        self._actions_text: Optional[str] = None  # cached get_actions_text()
+        self.rolling_summary: str = ""
+        self._summarized_count = 0  # Actions after the first ones folded into the summary
         self._init_file_types()
 
     def set_query(self, query: str) -> None:
@@ -68,13 +95,16 @@ class Memory:
         self, step_count: int, tool_name: str, sub_goal: str, command: str, result: Any
     ) -> None:
         action = {
+            "step": step_count,
             "tool_name": tool_name,
             "sub_goal": sub_goal,
             "command": command,
             "result": result,
         }
-        step_name = f"Action Step {step_count}"
-        self.actions[step_name] = action
+        self.actions.append(action)
+        self._action_texts.append(repr(action))
+        self._actions_text = None
+        self.action_count += 1
 
     def get_query(self) -> Optional[str]:
         return self.query
@@ -82,5 +112,107 @@ class Memory:
     def get_files(self) -> List[Dict[str, str]]:
         return self.files
 
-    def get_actions(self) -> Dict[str, Dict[str, Any]]:
-        return self.actions
+    def get_actions(self) -> List[Dict[str, Any]]:
+        return list(self.actions)
+
+    def get_actions_text(self) -> str:
+        """Return the actions as they are rendered in prompts, i.e. the str() of
+        get_actions(), reusing each action's text until a new one is added."""
+        if self._actions_text is None:
+            self._actions_text = "[" + ", ".join(self._action_texts) + "]"
+        return self._actions_text
+
+    def get_recent(self, k: int = 8) -> List[Dict[str, Any]]:
+        """Return the last ``k`` actions."""
+        if k >= len(self.actions):
+            return list(self.actions)
+        return list(self.actions)[-k:]
+
+    def build_context_for(self, tool_name: str, k: int = 2) -> str:
+        """Assemble the context a tool needs for its next command.
+
+        Includes the query, the attached files, the rolling summary, the last
+        ``k`` actions and the latest earlier action of the same tool, so the
+        planner does not have to restate them.
+        """
+        lines = []
+        if self.query:
+            lines.append(f"Query: {self.query}")
+        for file in self.files:
+            lines.append(f"File: {file['file_name']} ({file['description']})")
+        if self.rolling_summary:
+            lines.append(f"Summary of earlier steps: {self.rolling_summary}")
+
+        recent = self.get_recent(k)
+        same_tool = next(
+            (
+                action
+                for action in reversed(self.actions)
+                if action["tool_name"] == tool_name
+            ),
+            None,
+        )
+        if same_tool is not None and all(same_tool is not a for a in recent):
+            recent.insert(0, same_tool)
+        if recent:
+            lines.append("Previous Results:")
+        for action in recent:
+            lines.append(
+                f"- Step {action['step']} ({action['tool_name']}, "
+                f"{action['sub_goal']}): {action['result']!r}"
+            )
+        return "\n".join(lines)
+
+    def _indexed_actions(self) -> List[Tuple[int, Dict[str, Any]]]:
+        """Return the kept actions with their position among all added ones."""
+        offset = self.action_count - len(self.actions)
+        return list(enumerate(self.actions, start=offset))
+
+    def windowed(self, k: int = 4, keep_first: int = 1) -> MemoryWindow:
+        """Return a view with the first actions, the rolling summary of the
+        middle ones and every action that has not been summarized yet."""
+        if self.action_count <= keep_first + k or not self._summarized_count:
+            return MemoryWindow(list(self.actions), list(self._action_texts))
+        start = keep_first + self._summarized_count
+        indexed = list(zip(self._indexed_actions(), self._action_texts))
+        actions = [action for (index, action), _ in indexed if index < keep_first]
+        texts = [text for (index, _), text in indexed if index < keep_first]
+        summary = {"summary_of_earlier_steps": self.rolling_summary}
+        actions.append(summary)
+        texts.append(repr(summary))
+        actions.extend(action for (index, action), _ in indexed if index >= start)
+        texts.extend(text for (index, _), text in indexed if index >= start)
+        return MemoryWindow(actions, texts)
+
+    async def summarize_older(self, llm_engine: Any, k: int = 4, keep_first: int = 1) -> str:
+        """Fold actions that fell out of the window into the rolling summary.
+
+        The summary is only refreshed once ``k`` such actions have accumulated;
+        until then they stay verbatim in the windowed view. Actions already
+        dropped by ``max_history`` are skipped.
+        """
+        start = keep_first + self._summarized_count
+        end = max(start, self.action_count - k)
+        if end - start < k:
+            return self.rolling_summary
+        older = [
+            action for index, action in self._indexed_actions() if start <= index < end
+        ]
+
+        prompt = f"""
+Task: Update the running summary of the steps taken so far.
+
+Current Summary:
+{self.rolling_summary or "None"}
+
+New Steps and Their Results:
+{older}
+
+Instructions:
+1. Merge the new steps into the current summary.
+2. Keep every fact, file name, variable and value a later step may need.
+3. Be concise and do not add information that is not in the steps.
+"""
+        self.rolling_summary = str(await llm_engine(prompt)).strip()
+        self._summarized_count = end - keep_first
+        return self.rolling_summary
@@ -1,19 +1,257 @@
 import os
 import re
-from PIL import Image
-from typing import Dict, Any, List, Optional, Tuple
+import sys
+import string
+import asyncio
+from collections import OrderedDict
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple, Type, Union
 from dataclasses import dataclass
-import json
 import logging
 
-from ..config import CoreConfig
+import aiofiles
+import orjson
+from pydantic import BaseModel
+
+from ..cache import SemanticCache, cached, call_cache_key
+from ..throttle import DualTokenBucket
+from openai import AsyncOpenAI
 from ..engine.factory import create_llm_engine
 from ..memory import Memory
-from ..formatters import QueryAnalysis, NextStep, MemoryVerification
+from ..utils import StreamingFieldExtractor, lazy_json
+from ..formatters import (
+    QueryAnalysis,
+    NextStep,
+    MemoryVerification,
+    PlanAndVerify,
+    PlannedStep,
+    StepPlan,
+)
 
 # Set up logging
 logger = logging.getLogger(__name__)
 
+# "Label: value" lines of plain-text responses, used when they are not JSON;
+# the last line of each label wins
+_STEP_FIELD_RE = re.compile(r"^(Context|Sub-Goal|Tool Name|Tool):(.*)$", re.MULTILINE)
+_STEP_FIELD_SLOTS = {
+    "Context": "context",
+    "Sub-Goal": "sub_goal",
+    "Tool": "tool_name",
+    "Tool Name": "tool_name",
+}
+_CONCLUSION_FIELD_RE = re.compile(r"^(Analysis|Conclusion):(.*)$", re.MULTILINE)
+
+# dataclass(slots=True) is only available from Python 3.10
+_DATACLASS_SLOTS = {"slots": True} if sys.version_info >= (3, 10) else {}
+
+
+@dataclass(frozen=True, **_DATACLASS_SLOTS)
+class ImageInfo:
+    """Image accompanying a query; ``path`` is None when there is none."""
+
+    path: Optional[str] = None
+
+
+# Shared result of get_image_info() for queries without an image
+_NO_IMAGE = ImageInfo()
+
+
+class _LRUCache:
+    """Small in-process LRU mapping, evicting the least recently used entry."""
+
+    def __init__(self, maxsize: int = 16):
+        self.maxsize = maxsize
+        self._entries: "OrderedDict[Any, Any]" = OrderedDict()
+
+    def get(self, key: Any) -> Optional[Any]:
+        value = self._entries.get(key)
+        if value is not None:
+            self._entries.move_to_end(key)
+        return value
+
+    def put(self, key: Any, value: Any) -> None:
+        self._entries[key] = value
+        self._entries.move_to_end(key)
+        if len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+
+# Image file contents keyed by (path, mtime_ns). The same image is read for
+# several calls of a session; keying on the modification time makes a
+# rewritten file miss instead of going stale.
+_image_bytes_cache = _LRUCache(maxsize=16)
+
+
+async def _read_image_bytes(path: str) -> bytes:
+    """Return the contents of an image file, reading it at most once per version."""
+    key = (path, os.stat(path).st_mtime_ns)
+    data = _image_bytes_cache.get(key)
+    if data is None:
+        # Read without blocking the event loop, which may be serving the
+        # concurrent query analysis meanwhile
+        async with aiofiles.open(path, "rb") as file:
+            data = await file.read()
+        _image_bytes_cache.put(key, data)
+    return data
+
+
+# Structured output format of the standalone query analysis
+_QUERY_ANALYSIS_FORMAT = {
+    "type": "json_schema",
+    "json_schema": {
+        "name": "QueryAnalysis",
+        "schema": {
+            "type": "object",
+            "properties": {
+                "concise_summary": {"type": "string"},
+                "required_skills": {"type": "string"},
+                "additional_considerations": {"type": "string"},
+            },
+            "required": [
+                "concise_summary",
+                "required_skills",
+                "additional_considerations",
+            ],
+        },
+    },
+}
+
+# Structured output format of the combined analysis and first step
+_BOOTSTRAP_FORMAT = {
+    "type": "json_schema",
+    "json_schema": {
+        "name": "AnalyzeAndBootstrap",
+        "schema": {
+            "type": "object",
+            "properties": {
+                "query_analysis": _QUERY_ANALYSIS_FORMAT["json_schema"]["schema"],
+                "base_response": {"type": "string"},
+                "next_step": NextStep.model_json_schema(),
+            },
+            "required": ["query_analysis", "base_response", "next_step"],
+        },
+    },
+}
+
+# Structured output format of the multi-step plan
+_STEP_PLAN_FORMAT = {
+    "type": "json_schema",
+    "json_schema": {
+        "name": "StepPlan",
+        "schema": StepPlan.model_json_schema(),
+    },
+}
+
+# Streamed verification format; non-streaming engines get the model itself
+_MEMORY_VERIFICATION_FORMAT = {
+    "type": "json_schema",
+    "json_schema": {
+        "name": "MemoryVerification",
+        "schema": MemoryVerification.model_json_schema(),
+    },
+}
+
+
+def _validate(model: Type[BaseModel], response: Any) -> BaseModel:
+    """Validate a structured response, parsing JSON text in pydantic-core."""
+    if isinstance(response, dict):
+        return model.model_validate(response)
+    return model.model_validate_json(str(response))
+
+
+def _parse_query_analysis(response: Any) -> Union[QueryAnalysis, str]:
+    """Parse a query analysis response, keeping unstructured text as it is."""
+    if isinstance(response, QueryAnalysis):
+        return response
+    try:
+        return _validate(QueryAnalysis, response)
+    except ValueError:
+        return str(response).strip()
+
+
+def _render_query_analysis(query_analysis: Union[QueryAnalysis, str]) -> str:
+    """Render the parts of a query analysis that planning prompts need."""
+    if isinstance(query_analysis, QueryAnalysis):
+        return (
+            f"{query_analysis.concise_summary}\n"
+            f"Required Skills: {query_analysis.required_skills}"
+        )
+    return query_analysis
+
+
+# Prompt templates shipped next to this module, read once at import
+_PROMPTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "prompts")
+
+
+def _load_prompt(name: str) -> str:
+    with open(os.path.join(_PROMPTS_DIR, name), encoding="utf-8") as file:
+        return file.read()
+
+
+class _PromptTemplate:
+    """A ``str.format`` template split into its literal and field parts once.
+
+    ``format`` joins the cached parts with the values, which skips parsing
+    the template again on every prompt. Only plain ``{name}`` fields are
+    supported.
+    """
+
+    __slots__ = ("template", "_parts")
+
+    def __init__(self, template: str):
+        self.template = template
+        self._parts: List[Tuple[str, Optional[str]]] = []
+        for literal, field, spec, conversion in string.Formatter().parse(template):
+            if spec or conversion:
+                raise ValueError(f"Unsupported prompt field: {field!r}")
+            self._parts.append((literal, field))
+
+    def format(self, **values: Any) -> str:
+        pieces = []
+        for literal, field in self._parts:
+            pieces.append(literal)
+            if field is not None:
+                pieces.append(str(values[field]))
+        return "".join(pieces)
+
+
+# Static parts of the planning prompts, filled in with the tools once per
+# Planner and sent as system prompts
+_NEXT_STEP_SYSTEM_TEMPLATE = _load_prompt("next_step_system.tpl")
+_PLAN_AND_VERIFY_SYSTEM_TEMPLATE = _load_prompt("plan_and_verify_system.tpl")
+_BOOTSTRAP_SYSTEM_TEMPLATE = _load_prompt("bootstrap_system.tpl")
+_STEP_PLAN_SYSTEM_TEMPLATE = _load_prompt("step_plan_system.tpl")
+
+# Instructions of the standalone query analysis, verification and final
+# answer, sent unchanged as system prompts
+_ANALYZE_QUERY_SYSTEM_PROMPT = _load_prompt("analyze_query_system.tpl")
+_VERIFICATION_SYSTEM_PROMPT = _load_prompt("verification_system.tpl")
+_FINAL_OUTPUT_SYSTEM_PROMPT = _load_prompt("final_output_system.tpl")
+
+# Dynamic part of the standalone query analysis prompt
+_ANALYZE_QUERY_TEMPLATE = _PromptTemplate(_load_prompt("analyze_query.tpl"))
+
+# Dynamic part of the combined analysis and first step prompt
+_BOOTSTRAP_USER_TEMPLATE = _PromptTemplate(_load_prompt("bootstrap_user.tpl"))
+
+# Dynamic part of the next step and combined verification prompts
+_STEP_USER_TEMPLATE = _PromptTemplate(_load_prompt("step_user.tpl"))
+
+# Dynamic part of the multi-step planning prompt
+_STEP_PLAN_USER_TEMPLATE = _PromptTemplate(
+    _STEP_USER_TEMPLATE.template + "Steps To Plan: at most {k}\n"
+)
+
+# Dynamic part of the standalone context verification prompt
+_VERIFICATION_TEMPLATE = _PromptTemplate(_load_prompt("verification.tpl"))
+
+# Dynamic part of the final answer prompt, shared by the streaming and plain
+# variants
+_FINAL_OUTPUT_TEMPLATE = _PromptTemplate(_load_prompt("final_output.tpl"))
+
+# Prompt of the answer given without using any tools
+_DIRECT_OUTPUT_TEMPLATE = _PromptTemplate(_load_prompt("direct_output.tpl"))
+
 
 class Planner:
     """Planner class for Intentus agent."""
@@ -23,17 +261,43 @@ class Planner:
         llm_engine_name: str,
         toolbox_metadata: Dict[str, Any],
         available_tools: List[str],
+        toolbox_metadata_json: Optional[Dict[str, str]] = None,
         verbose: bool = True,
+        cache: Optional[SemanticCache] = None,
+        throttle: Optional[DualTokenBucket] = None,
+        client: Optional[AsyncOpenAI] = None,
     ):
         """Initialize the planner."""
-        logger.debug(f"Initializing Planner with engine: {llm_engine_name}")
-        logger.debug(f"Available tools: {available_tools}")
-        logger.debug(f"Toolbox metadata: {json.dumps(toolbox_metadata, indent=2)}")
+        logger.debug("Initializing Planner with engine: %s", llm_engine_name)
+        logger.debug("Available tools: %s", available_tools)
+        logger.debug("Toolbox metadata: %s", lazy_json(toolbox_metadata))
 
-        self.llm_engine = create_llm_engine(llm_engine_name)
+        self.llm_engine = create_llm_engine(
+            llm_engine_name, throttle=throttle, client=client
+        )
         self.toolbox_metadata = toolbox_metadata
+        if toolbox_metadata_json is None:
+            toolbox_metadata_json = {
+                tool_name: orjson.dumps(
+                    metadata, default=str, option=orjson.OPT_SORT_KEYS
+                ).decode()
+                for tool_name, metadata in toolbox_metadata.items()
+            }
+        self.toolbox_metadata_json = toolbox_metadata_json
+        # Rendered once, embedded verbatim in every planning prompt
+        self.toolbox_metadata_text = "\n".join(
+            f"{tool_name}: {metadata}"
+            for tool_name, metadata in toolbox_metadata_json.items()
+        )
         self.available_tools = available_tools
+        self.available_tools_set = frozenset(available_tools)
+        # Static prompt prefixes, byte-identical on every call
+        self.next_step_system_prompt = self._build_next_step_system_prompt()
+        self.plan_and_verify_system_prompt = self._build_plan_and_verify_system_prompt()
+        self.bootstrap_system_prompt = self._build_bootstrap_system_prompt()
+        self.step_plan_system_prompt = self._build_step_plan_system_prompt()
         self.verbose = verbose
+        self.cache = cache
         self.query_analysis = None
         self.context = None
         self.subgoal = None
@@ -41,461 +305,689 @@ class Planner:
         self.command = None
         self.final_output = None
         self.direct_output = None
+        # Responses to recent analysis and verification prompts, so repeated
+        # queries skip the LLM even without an on-disk cache
+        self._response_memo = _LRUCache(maxsize=128)
+        # Whether each image path seen so far exists, checked once per path
+        self._image_exists: Dict[str, bool] = {}
         logger.debug("Planner initialized")
 
-    def get_image_info(self, image_path: str) -> Dict[str, Any]:
+    def _build_next_step_system_prompt(self) -> str:
+        """Build the static part of the next step prompt."""
+        return _NEXT_STEP_SYSTEM_TEMPLATE.format(
+            available_tools=self.available_tools,
+            toolbox_metadata=self.toolbox_metadata_text,
+        )
+
+    def _build_plan_and_verify_system_prompt(self) -> str:
+        """Build the static part of the combined verification and planning prompt."""
+        return _PLAN_AND_VERIFY_SYSTEM_TEMPLATE.format(
+            available_tools=self.available_tools,
+            toolbox_metadata=self.toolbox_metadata_text,
+        )
+
+    def _build_bootstrap_system_prompt(self) -> str:
+        """Build the static part of the combined analysis and first step prompt."""
+        return _BOOTSTRAP_SYSTEM_TEMPLATE.format(
+            available_tools=self.available_tools,
+            toolbox_metadata=self.toolbox_metadata_text,
+        )
+
+    def _build_step_plan_system_prompt(self) -> str:
+        """Build the static part of the multi-step planning prompt."""
+        return _STEP_PLAN_SYSTEM_TEMPLATE.format(
+            available_tools=self.available_tools,
+            toolbox_metadata=self.toolbox_metadata_text,
+        )
+
+    async def aclose(self) -> None:
+        """Close the connections held by the LLM engine, if it has any."""
+        aclose = getattr(self.llm_engine, "aclose", None)
+        if aclose is not None:
+            await aclose()
+
+    def get_image_info(self, image_path: str) -> "ImageInfo":
         """Get image information."""
-        logger.debug(f"Getting image info for: {image_path}")
+        logger.debug("Getting image info for: %s", image_path)
         if not image_path:
             logger.debug("No image path provided")
-            return {}
-        logger.debug(f"Image path exists: {os.path.exists(image_path)}")
-        return {"image_path": image_path}
+            return _NO_IMAGE
+        if logger.isEnabledFor(logging.DEBUG):
+            exists = self._image_exists.get(image_path)
+            if exists is None:
+                exists = self._image_exists[image_path] = os.path.exists(image_path)
+            logger.debug("Image path exists: %s", exists)
+        return ImageInfo(path=image_path)
 
     async def generate_base_response(self, question: str, image: str) -> str:
         """Generate base response."""
-        logger.debug(f"Generating base response for question: {question}")
-        logger.debug(f"Image provided: {image}")
+        logger.debug("Generating base response for question: %s", question)
+        logger.debug("Image provided: %s", image)
 
         image_info = self.get_image_info(image)
-        logger.debug(f"Image info: {image_info}")
+        logger.debug("Image info: %s", image_info)
 
         input_data = [question]
-        if image_info and "image_path" in image_info:
+        if image_info.path:
             try:
-                with open(image_info["image_path"], "rb") as file:
-                    image_bytes = file.read()
+                image_bytes = await _read_image_bytes(image_info.path)
                 input_data.append(image_bytes)
                 logger.debug("Successfully read image file")
             except Exception as e:
-                logger.error(f"Error reading image file: {str(e)}")
+                logger.error("Error reading image file: %s", e)
 
         logger.debug("Calling LLM engine for base response")
-        self.base_response = await self.llm_engine(question)
-        logger.debug(f"Base response generated: {self.base_response}")
+        response = await self.llm_engine(question)
+        logger.debug("Base response generated: %s", response)
 
-        return self.base_response
+        # Set after the call, so concurrent calls never return each other's response
+        self.base_response = response
+        return response
 
-    async def analyze_query(self, question: str, image: str) -> str:
+    async def bootstrap(
+        self, question: str, image: str
+    ) -> Tuple[Union[QueryAnalysis, str], str]:
+        """Analyze the query and generate the base response concurrently.
+
+        Both only depend on the question and image, so the two LLM calls are
+        in flight at the same time. Returns (query_analysis, base_response).
+        """
+        query_analysis, base_response = await asyncio.gather(
+            self.analyze_query(question, image),
+            self.generate_base_response(question, image),
+        )
+        self.query_analysis = query_analysis
+        self.base_response = base_response
+        return query_analysis, base_response
+
+    @cached(ttl=24 * 60 * 60)
+    async def analyze_query(
+        self, question: str, image: str
+    ) -> Union[QueryAnalysis, str]:
         """Analyze the query and determine required skills."""
-        logger.debug(f"Analyzing query: {question}")
-        logger.debug(f"Image provided: {image}")
-
-        prompt = f"""
-Task: Analyze the given query with accompanying inputs and determine the skills and tools needed to address it effectively.
+        logger.debug("Analyzing query: %s", question)
+        logger.debug("Image provided: %s", image)
+
+        prompt = _ANALYZE_QUERY_TEMPLATE.format(image=image, question=question)
+        memo_key = ("analysis", prompt)
+        response = self._response_memo.get(memo_key)
+        if response is None:
+            logger.debug("Calling LLM engine for query analysis")
+            response = await self.llm_engine(
+                prompt,
+                response_format=_QUERY_ANALYSIS_FORMAT,
+                system_prompt=_ANALYZE_QUERY_SYSTEM_PROMPT,
+            )
+            if response is not None:
+                self._response_memo.put(memo_key, response)
+        logger.debug("Query analysis response: %s", response)
+
+        query_analysis = _parse_query_analysis(response)
+        self.query_analysis = query_analysis
+        return query_analysis
+
+    async def analyze_queries_batch(
+        self, queries: List[Tuple[str, str]]
+    ) -> List[Union[QueryAnalysis, str, Exception]]:
+        """Analyze several (question, image) queries at once.
+
+        All analyses are in flight concurrently, keeping the LLM backend's
+        batcher busy. A failed analysis yields its exception in place of the
+        result instead of failing the whole batch.
+        """
+        logger.debug("Analyzing %d queries concurrently", len(queries))
+        return await asyncio.gather(
+            *[self.analyze_query(question, image) for question, image in queries],
+            return_exceptions=True,
+        )
 
-Image: {image}
+    @cached(ttl=24 * 60 * 60)
+    async def analyze_and_bootstrap(
+        self, question: str, image: str, max_step_count: int
+    ) -> Tuple[QueryAnalysis, str, NextStep]:
+        """Analyze the query, answer it directly and plan the first step in one call.
 
-Query: {question}
+        Returns:
+            Tuple of the query analysis (as JSON), the base response and the first step
 
-Instructions:
-1. Carefully read and understand the query and any accompanying inputs.
-2. Identify the main objectives or tasks within the query.
-3. List the specific skills that would be necessary to address the query comprehensively.
-4. Provide a brief explanation for each skill you've identified, describing how it would contribute to answering the query.
+        Raises:
+            ValueError: If the response cannot be parsed into all three parts
+        """
+        logger.debug("Analyzing and bootstrapping query: %s", question)
 
-Your response should include:
-1. A concise summary of the query's main points and objectives, as well as content in any accompanying inputs.
-2. A list of required skills, with a brief explanation for each.
-3. Any additional considerations that might be important for addressing the query effectively.
+        prompt = _BOOTSTRAP_USER_TEMPLATE.format(
+            question=question, image=image, max_step_count=max_step_count
+        )
 
-Please present your analysis in a clear, structured format.
-"""
-        logger.debug("Calling LLM engine for query analysis")
+        logger.debug("Calling LLM engine for combined analysis and first step")
         response = await self.llm_engine(
             prompt,
-            response_format={
-                "type": "json_schema",
-                "json_schema": {
-                    "name": "QueryAnalysis",
-                    "schema": {
-                        "type": "object",
-                        "properties": {
-                            "concise_summary": {"type": "string"},
-                            "required_skills": {"type": "string"},
-                            "additional_considerations": {"type": "string"},
-                        },
-                        "required": [
-                            "concise_summary",
-                            "required_skills",
-                            "additional_considerations",
-                        ],
-                    },
-                },
-            },
+            system_prompt=self.bootstrap_system_prompt,
+            response_format=_BOOTSTRAP_FORMAT,
         )
-        logger.debug(f"Query analysis response: {response}")
-
-        self.query_analysis = response
-        return str(response).strip()
+        logger.debug("Combined analysis response: %s", response)
 
-    def extract_context_subgoal_and_tool(self, response: Any) -> Tuple[str, str, str]:
-        """Extract context, subgoal, and tool from the response."""
-        logger.debug(f"Extracting context, subgoal, and tool from response: {response}")
-        logger.debug(f"Response type: {type(response)}")
+        query_analysis, base_response, next_step = self._parse_bootstrap_response(
+            response
+        )
+        self.query_analysis = query_analysis
+        self.base_response = base_response
+        return query_analysis, base_response, next_step
+
+    @staticmethod
+    def _parse_bootstrap_response(
+        response: Any,
+    ) -> Tuple[QueryAnalysis, str, NextStep]:
+        """Split a combined analysis response into its three parts.
+
+        Raises:
+            ValueError: If the response cannot be parsed into all three parts
+        """
+        try:
+            data = response if isinstance(response, dict) else orjson.loads(str(response))
+            query_analysis = QueryAnalysis.model_validate(data["query_analysis"])
+            base_response = str(data["base_response"])
+            next_step = NextStep.model_validate(data["next_step"])
+        except Exception as e:
+            raise ValueError(f"Could not parse combined analysis response: {str(e)}")
+        return query_analysis, base_response, next_step
+
+    async def run_batch(
+        self, queries: List[Tuple[str, str]], max_step_count: int
+    ) -> List[Union[Tuple[QueryAnalysis, str, NextStep], Exception]]:
+        """Analyze, answer and plan the first step of many queries in one batch.
+
+        Equivalent to analyze_and_bootstrap() for every (question, image)
+        pair, but all prompts not already cached are handed to the engine's
+        ``batch()`` together, so batching backends schedule them as one
+        batch. A query that fails yields its exception in place of the result.
+        """
+        logger.debug("Bootstrapping %d queries in one batch", len(queries))
+        results: List[Any] = [None] * len(queries)
+        cache_keys = [None] * len(queries)
+        pending = []  # indices of the queries that need an LLM call
+        for index, (question, image) in enumerate(queries):
+            if self.cache is not None:
+                cache_keys[index] = call_cache_key(
+                    self.cache,
+                    Planner.analyze_and_bootstrap,
+                    (self, question, image, max_step_count),
+                    {},
+                )
+                cached_result = await self.cache.get(*cache_keys[index])
+                if cached_result is not None:
+                    results[index] = cached_result
+                    continue
+            pending.append(index)
+
+        if pending:
+            prompts = [
+                _BOOTSTRAP_USER_TEMPLATE.format(
+                    question=queries[index][0],
+                    image=queries[index][1],
+                    max_step_count=max_step_count,
+                )
+                for index in pending
+            ]
+            if hasattr(self.llm_engine, "batch"):
+                responses = await self.llm_engine.batch(
+                    prompts,
+                    response_format=_BOOTSTRAP_FORMAT,
+                    system_prompt=self.bootstrap_system_prompt,
+                )
+            else:
+                responses = await asyncio.gather(
+                    *[
+                        self.llm_engine(
+                            prompt,
+                            system_prompt=self.bootstrap_system_prompt,
+                            response_format=_BOOTSTRAP_FORMAT,
+                        )
+                        for prompt in prompts
+                    ],
+                    return_exceptions=True,
+                )
+
+            for index, response in zip(pending, responses):
+                if isinstance(response, Exception):
+                    results[index] = response
+                    continue
+                try:
+                    results[index] = self._parse_bootstrap_response(response)
+                except ValueError as e:
+                    results[index] = e
+                    continue
+                if self.cache is not None:
+                    await self.cache.set(
+                        *cache_keys[index], results[index], ttl=24 * 60 * 60
+                    )
+
+        return results
+
+    def extract_context_subgoal_and_tool(
+        self, response: Any, memory: Optional[Memory] = None
+    ) -> Tuple[str, str, str]:
+        """Extract context, subgoal, and tool from the response.
+
+        The planner no longer asks the LLM to restate the context; unless the
+        response still carries one, it is assembled from ``memory``.
+        """
+        context, subgoal, tool = self._parse_next_step(response)
+        if not context and memory is not None:
+            context = memory.build_context_for(tool)
+        return context, subgoal, tool
+
+    def _parse_next_step(self, response: Any) -> Tuple[str, str, str]:
+        """Parse a next step response into (context, subgoal, tool)."""
+        if isinstance(response, NextStep):
+            # Already validated, nothing to parse
+            return "", response.sub_goal, response.tool_name
+        logger.debug(
+            "Extracting context, subgoal, and tool from response: %s", response
+        )
+        logger.debug("Response type: %s", type(response))
 
         try:
             # If response is already a dict, use it directly
             if isinstance(response, dict):
                 logger.debug("Response is already a dict")
                 data = response
+            elif isinstance(response, BaseModel):
+                logger.debug("Response is already a parsed model")
+                data = response.model_dump()
             else:
                 # Try to parse as JSON
                 logger.debug("Attempting to parse response as JSON")
-                import json
-
                 try:
-                    data = json.loads(str(response))
+                    data = orjson.loads(
+                        response
+                        if isinstance(response, (bytes, bytearray, str))
+                        else str(response)
+                    )
                     logger.debug("Successfully parsed response as JSON")
-                except json.JSONDecodeError as e:
-                    logger.error(f"Failed to parse response as JSON: {str(e)}")
+                except orjson.JSONDecodeError as e:
+                    logger.error("Failed to parse response as JSON: %s", e)
                     raise
 
-            logger.debug(f"Parsed data: {data}")
+            logger.debug("Parsed data: %s", data)
 
             # Extract values from the parsed data
             context = data.get("context", "")
             subgoal = data.get("sub_goal", "")
             tool = data.get("tool_name", "")
 
-            logger.debug(f"Final extracted values:")
-            logger.debug(f"Context: '{context}'")
-            logger.debug(f"Subgoal: '{subgoal}'")
-            logger.debug(f"Tool: '{tool}'")
+            logger.debug("Final extracted values:")
+            logger.debug("Context: '%s'", context)
+            logger.debug("Subgoal: '%s'", subgoal)
+            logger.debug("Tool: '%s'", tool)
 
             return context, subgoal, tool
 
         except Exception as e:
-            logger.error(f"Error parsing response: {str(e)}")
+            logger.error("Error parsing response: %s", e)
             # Fallback to old string parsing method
             logger.debug("Falling back to string parsing method")
-            lines = str(response).split("\n")
-            logger.debug(f"Split response into {len(lines)} lines")
-
-            context = ""
-            subgoal = ""
-            tool = ""
-
-            for line in lines:
-                logger.debug(f"Processing line: {line}")
-                if line.startswith("Context:"):
-                    context = line.replace("Context:", "").strip()
-                    logger.debug(f"Found context: {context}")
-                elif line.startswith("Sub-Goal:"):
-                    subgoal = line.replace("Sub-Goal:", "").strip()
-                    logger.debug(f"Found subgoal: {subgoal}")
-                elif line.startswith("Tool:"):
-                    tool = line.replace("Tool:", "").strip()
-                    logger.debug(f"Found tool: {tool}")
-                elif line.startswith("Tool Name:"):
-                    tool = line.replace("Tool Name:", "").strip()
-                    logger.debug(f"Found tool: {tool}")
-
-            logger.debug(f"Fallback extracted values:")
-            logger.debug(f"Context: '{context}'")
-            logger.debug(f"Subgoal: '{subgoal}'")
-            logger.debug(f"Tool: '{tool}'")
+            fields = {"context": "", "sub_goal": "", "tool_name": ""}
+            for match in _STEP_FIELD_RE.finditer(str(response)):
+                label, value = match.groups()
+                fields[_STEP_FIELD_SLOTS[label]] = value.strip()
+            context = fields["context"]
+            subgoal = fields["sub_goal"]
+            tool = fields["tool_name"]
+
+            logger.debug("Fallback extracted values:")
+            logger.debug("Context: '%s'", context)
+            logger.debug("Subgoal: '%s'", subgoal)
+            logger.debug("Tool: '%s'", tool)
 
             return context, subgoal, tool
 
+    @cached(ttl=24 * 60 * 60)
     async def generate_next_step(
         self,
         question: str,
         image: str,
-        query_analysis: str,
+        query_analysis: Union[QueryAnalysis, str],
         memory: Memory,
         step_count: int,
         max_step_count: int,
     ) -> Any:
         """Generate next step."""
-        logger.debug(f"Generating next step for question: {question}")
-        logger.debug(f"Current step: {step_count + 1} of {max_step_count}")
-        logger.debug(f"Query analysis: {query_analysis}")
-
-        prompt = f"""
-Task: Determine the optimal next step to address the given query based on the provided analysis, available tools, and previous steps taken.
-
-Context:
-Query: {question}
-Image: {image}
-Query Analysis: {query_analysis}
-
-Available Tools:
-{self.available_tools}
-
-Tool Metadata:
-{self.toolbox_metadata}
-
-Previous Steps and Their Results:
-{memory.get_actions()}
-
-Current Step: {step_count} in {max_step_count} steps
-Remaining Steps: {max_step_count - step_count}
-
-Instructions:
-1. Analyze the context thoroughly, including the query, its analysis, any image, available tools and their metadata, and previous steps taken.
-
-2. Determine the most appropriate next step by considering:
-   - Key objectives from the query analysis
-   - Capabilities of available tools
-   - Logical progression of problem-solving
-   - Outcomes from previous steps
-   - Current step count and remaining steps
-
-3. Select ONE tool best suited for the next step, keeping in mind the limited number of remaining steps.
-
-4. Formulate a specific, achievable sub-goal for the selected tool that maximizes progress towards answering the query.
-
-Response Format:
-Your response MUST follow this structure:
-1. Justification: Explain your choice in detail.
-2. Context, Sub-Goal, and Tool: Present the context, sub-goal, and the selected tool ONCE with the following format:
-
-Context: <context>
-Sub-Goal: <sub_goal>
-Tool Name: <tool_name>
-
-Where:
-- <context> MUST include ALL necessary information for the tool to function, structured as follows:
-  * Relevant data from previous steps
-  * File names or paths created or used in previous steps (list EACH ONE individually)
-  * Variable names and their values from previous steps' results
-  * Any other context-specific information required by the tool
-- <sub_goal> is a specific, achievable objective for the tool, based on its metadata and previous outcomes.
-It MUST contain any involved data, file names, and variables from Previous Steps and Their Results that the tool can act upon.
-- <tool_name> MUST be the exact name of a tool from the available tools list.
-
-Rules:
-- Select only ONE tool for this step.
-- The sub-goal MUST directly address the query and be achievable by the selected tool.
-- The Context section MUST include ALL necessary information for the tool to function, including ALL relevant file paths, data, and variables from previous steps.
-- The tool name MUST exactly match one from the available tools list: {self.available_tools}.
-"""
+        logger.debug("Generating next step for question: %s", question)
+        logger.debug("Current step: %s of %s", step_count + 1, max_step_count)
+        logger.debug("Query analysis: %s", query_analysis)
+
+        prompt = _STEP_USER_TEMPLATE.format(
+            question=question,
+            image=image,
+            query_analysis=_render_query_analysis(query_analysis),
+            actions=memory.get_actions_text(),
+            step_count=step_count,
+            max_step_count=max_step_count,
+            remaining_steps=max_step_count - step_count,
+        )
 
         logger.debug("Calling LLM engine for next step generation")
         response = await self.llm_engine(
             prompt,
-            response_format={
-                "type": "json_schema",
-                "json_schema": {
-                    "name": "NextStep",
-                    "schema": {
-                        "type": "object",
-                        "properties": {
-                            "justification": {"type": "string"},
-                            "context": {"type": "string"},
-                            "sub_goal": {"type": "string"},
-                            "tool_name": {"type": "string"},
-                        },
-                        "required": [
-                            "justification",
-                            "context",
-                            "sub_goal",
-                            "tool_name",
-                        ],
-                    },
-                },
-            },
+            system_prompt=self.next_step_system_prompt,
+            response_format=NextStep,
         )
-        logger.debug(f"Raw LLM response for next step: {response}")
-        logger.debug(f"Response type: {type(response)}")
-        if isinstance(response, dict):
-            logger.debug(f"Response keys: {response.keys()}")
+        logger.debug("Raw LLM response for next step: %s", response)
+        if isinstance(response, dict) and logger.isEnabledFor(logging.DEBUG):
             logger.debug(
-                f"Tool name from response: {response.get('tool_name', 'NOT FOUND')}"
+                "Tool name from response: %s", response.get("tool_name", "NOT FOUND")
             )
-        else:
-            logger.debug(f"Response as string: {str(response)}")
-            # Log the exact format of the response
-            logger.debug("Response format analysis:")
-            for line in str(response).split("\n"):
-                logger.debug(f"Line: '{line}'")
 
         return response
 
+    @cached(ttl=24 * 60 * 60)
     async def verificate_context(
-        self, question: str, image: str, query_analysis: str, memory: Memory
+        self,
+        question: str,
+        image: str,
+        query_analysis: Union[QueryAnalysis, str],
+        memory: Memory,
     ) -> Any:
         """Verify context and determine if we should stop."""
         logger.debug("Verifying context and checking stop condition")
-        logger.debug(f"Question: {question}")
-        logger.debug(f"Query analysis: {query_analysis}")
+        logger.debug("Question: %s", question)
+        logger.debug("Query analysis: %s", query_analysis)
+
+        prompt = _VERIFICATION_TEMPLATE.format(
+            question=question,
+            image=image,
+            query_analysis=_render_query_analysis(query_analysis),
+            actions=memory.get_actions_text(),
+        )
+        memo_key = ("verification", prompt)
+        response = self._response_memo.get(memo_key)
+        if response is None:
+            response = await self._request_verification(prompt)
+            if response:
+                self._response_memo.put(memo_key, response)
+        logger.debug("Verification response: %s", response)
 
-        prompt = f"""
-Task: Verify if the current context and results are sufficient to answer the query.
+        return response
 
-Context:
-Query: {question}
-Image: {image}
-Query Analysis: {query_analysis}
+    async def _request_verification(self, prompt: str) -> Any:
+        """Ask the LLM engine whether the verification prompt calls for a stop."""
+        if hasattr(self.llm_engine, "stream"):
+            # Stop reading as soon as the stop signal is complete
+            logger.debug("Streaming LLM engine for context verification")
+            signal = StreamingFieldExtractor("stop_signal")
+            stream = self.llm_engine.stream(
+                prompt,
+                response_format=_MEMORY_VERIFICATION_FORMAT,
+                system_prompt=_VERIFICATION_SYSTEM_PROMPT,
+            )
+            try:
+                async for chunk in stream:
+                    stop_signal = signal.feed(chunk)
+                    if stop_signal is None:
+                        continue
+                    analysis = StreamingFieldExtractor("analysis").feed(signal.text)
+                    if analysis is not None:
+                        return MemoryVerification(
+                            analysis=analysis, stop_signal=stop_signal
+                        )
+            finally:
+                await stream.aclose()
+            return signal.text
+        logger.debug("Calling LLM engine for context verification")
+        return await self.llm_engine(
+            prompt,
+            response_format=MemoryVerification,
+            system_prompt=_VERIFICATION_SYSTEM_PROMPT,
+        )
+
+    @cached(ttl=24 * 60 * 60)
+    async def plan_and_verify(
+        self,
+        question: str,
+        image: str,
+        query_analysis: Union[QueryAnalysis, str],
+        memory: Memory,
+        step_count: int,
+        max_step_count: int,
+    ) -> Tuple[NextStep, MemoryVerification]:
+        """Verify the context and plan the next step in a single LLM call.
+
+        Raises:
+            ValueError: If the response cannot be parsed into both parts
+        """
+        logger.debug("Verifying context and planning next step in one call")
+        logger.debug("Next step: %s of %s", step_count + 1, max_step_count)
+
+        prompt = _STEP_USER_TEMPLATE.format(
+            question=question,
+            image=image,
+            query_analysis=_render_query_analysis(query_analysis),
+            actions=memory.get_actions_text(),
+            step_count=step_count,
+            max_step_count=max_step_count,
+            remaining_steps=max_step_count - step_count,
+        )
 
-Previous Steps and Their Results:
-{memory.get_actions()}
+        logger.debug("Calling LLM engine for combined verification and planning")
+        response = await self.llm_engine(
+            prompt,
+            system_prompt=self.plan_and_verify_system_prompt,
+            response_format=PlanAndVerify,
+        )
+        logger.debug("Combined planning response: %s", response)
 
-Instructions:
-1. Review the query and its analysis.
-2. Evaluate the results from previous steps.
-3. Determine if we have enough information to answer the query.
-4. Decide whether to continue or stop.
+        if not isinstance(response, PlanAndVerify):
+            try:
+                response = _validate(PlanAndVerify, response)
+            except Exception as e:
+                raise ValueError(
+                    f"Could not parse combined planning response: {str(e)}"
+                )
 
-Response Format:
-Your response MUST follow this structure:
-1. Analysis: Explain your reasoning in detail.
-2. Conclusion: Either "CONTINUE" or "STOP".
+        return response.next_step, response.verification
 
-Rules:
-- If we have enough information to answer the query, conclude with "STOP".
-- If we need more information or steps, conclude with "CONTINUE".
-- Be thorough in your analysis.
-"""
+    @cached(ttl=24 * 60 * 60)
+    async def generate_step_plan(
+        self,
+        question: str,
+        image: str,
+        query_analysis: Union[QueryAnalysis, str],
+        memory: Memory,
+        step_count: int,
+        max_step_count: int,
+        k: int = 3,
+    ) -> List[PlannedStep]:
+        """Plan up to ``k`` next steps together with their dependencies.
+
+        Raises:
+            ValueError: If the response cannot be parsed into a non-empty plan
+        """
+        logger.debug("Planning up to %s steps from step %s", k, step_count + 1)
+
+        prompt = _STEP_PLAN_USER_TEMPLATE.format(
+            question=question,
+            image=image,
+            query_analysis=_render_query_analysis(query_analysis),
+            actions=memory.get_actions_text(),
+            step_count=step_count,
+            max_step_count=max_step_count,
+            remaining_steps=max_step_count - step_count,
+            k=k,
+        )
 
-        logger.debug("Calling LLM engine for context verification")
+        logger.debug("Calling LLM engine for multi-step planning")
         response = await self.llm_engine(
             prompt,
-            response_format={
-                "type": "json_schema",
-                "json_schema": {
-                    "name": "MemoryVerification",
-                    "schema": {
-                        "type": "object",
-                        "properties": {
-                            "analysis": {"type": "string"},
-                            "stop_signal": {"type": "string"},
-                        },
-                        "required": ["analysis", "stop_signal"],
-                    },
-                },
-            },
+            system_prompt=self.step_plan_system_prompt,
+            response_format=_STEP_PLAN_FORMAT,
         )
-        logger.debug(f"Verification response: {response}")
+        logger.debug("Step plan response: %s", response)
 
-        return response
+        try:
+            steps = _validate(StepPlan, response).steps[:k]
+        except Exception as e:
+            raise ValueError(f"Could not parse step plan response: {str(e)}")
+        if not steps:
+            raise ValueError("Step plan response contains no steps")
+
+        return steps
 
     def extract_conclusion(self, response: Any) -> Tuple[str, str]:
         """Extract analysis and conclusion from verification response."""
-        logger.debug(f"Extracting conclusion from response: {response}")
+        if isinstance(response, MemoryVerification):
+            # Already validated, only the signal's spelling may vary
+            return response.analysis, response.stop_signal.strip().upper()
+        logger.debug("Extracting conclusion from response: %s", response)
 
         try:
             # If response is already a dict, use it directly
             if isinstance(response, dict):
                 logger.debug("Response is already a dict")
                 data = response
+            elif isinstance(response, BaseModel):
+                logger.debug("Response is already a parsed model")
+                data = response.model_dump()
             else:
                 # Try to parse as JSON
                 logger.debug("Attempting to parse response as JSON")
-                import json
-
                 try:
-                    data = json.loads(str(response))
+                    data = orjson.loads(
+                        response
+                        if isinstance(response, (bytes, bytearray, str))
+                        else str(response)
+                    )
                     logger.debug("Successfully parsed response as JSON")
-                except json.JSONDecodeError as e:
-                    logger.error(f"Failed to parse response as JSON: {str(e)}")
+                except orjson.JSONDecodeError as e:
+                    logger.error("Failed to parse response as JSON: %s", e)
                     raise
 
-            logger.debug(f"Parsed data: {data}")
+            logger.debug("Parsed data: %s", data)
 
             # Extract values from the parsed data
             analysis = data.get("analysis", "")
-            conclusion = data.get("stop_signal", "")
+            conclusion = str(data.get("stop_signal", "")).strip().upper()
 
-            logger.debug(f"Extracted analysis: {analysis}")
-            logger.debug(f"Extracted conclusion: {conclusion}")
+            logger.debug("Extracted analysis: %s", analysis)
+            logger.debug("Extracted conclusion: %s", conclusion)
 
             return analysis, conclusion
 
         except Exception as e:
-            logger.error(f"Error parsing response: {str(e)}")
+            logger.error("Error parsing response: %s", e)
             # Fallback to old string parsing method
             logger.debug("Falling back to string parsing method")
-            lines = str(response).split("\n")
-            analysis = ""
-            conclusion = ""
-
-            for line in lines:
-                if line.startswith("Analysis:"):
-                    analysis = line.replace("Analysis:", "").strip()
-                elif line.startswith("Conclusion:"):
-                    conclusion = line.replace("Conclusion:", "").strip()
-
-            logger.debug(f"Fallback extracted values:")
-            logger.debug(f"Analysis: '{analysis}'")
-            logger.debug(f"Conclusion: '{conclusion}'")
+            fields = {"Analysis": "", "Conclusion": ""}
+            for match in _CONCLUSION_FIELD_RE.finditer(str(response)):
+                label, value = match.groups()
+                fields[label] = value.strip()
+            analysis = fields["Analysis"]
+            conclusion = fields["Conclusion"]
+            if not conclusion:
+                # No labelled conclusion, go by whichever signal is mentioned last
+                text = str(response)
+                last_stop = text.rfind("STOP")
+                last_continue = text.rfind("CONTINUE")
+                if last_stop > last_continue:
+                    conclusion = "STOP"
+                elif last_continue >= 0:
+                    conclusion = "CONTINUE"
+
+            logger.debug("Fallback extracted values:")
+            logger.debug("Analysis: '%s'", analysis)
+            logger.debug("Conclusion: '%s'", conclusion)
 
             return analysis, conclusion
 
+    def _build_final_output_prompt(
+        self, question: str, image: str, memory: Memory
+    ) -> str:
+        """Build the final output prompt."""
+        return _FINAL_OUTPUT_TEMPLATE.format(
+            question=question, image=image, actions=memory.get_actions_text()
+        )
+
+    @cached(ttl=24 * 60 * 60)
     async def generate_final_output(
         self, question: str, image: str, memory: Memory
     ) -> str:
         """Generate final output."""
         logger.debug("Generating final output")
-        logger.debug(f"Question: {question}")
-
-        prompt = f"""
-Task: Generate a comprehensive final answer to the query based on all previous steps and their results.
-
-Context:
-Query: {question}
-Image: {image}
+        logger.debug("Question: %s", question)
 
-Previous Steps and Their Results:
-{memory.get_actions()}
-
-Instructions:
-1. Review all previous steps and their results.
-2. Synthesize the information into a coherent answer.
-3. Ensure the answer directly addresses the query.
-4. Present the information in a clear, structured format.
-
-Response Format:
-Your response should be a well-structured answer that:
-1. Directly addresses the query
-2. Incorporates relevant information from all steps
-3. Is clear and easy to understand
-4. Provides a complete and accurate response
-"""
+        prompt = self._build_final_output_prompt(question, image, memory)
 
         logger.debug("Calling LLM engine for final output generation")
-        response = await self.llm_engine(prompt)
-        logger.debug(f"Final output generated: {response}")
+        response = await self.llm_engine(
+            prompt, system_prompt=_FINAL_OUTPUT_SYSTEM_PROMPT
+        )
+        logger.debug("Final output generated: %s", response)
 
         self.final_output = response
         return response
 
-    def generate_direct_output(self, question: str, image: str, memory: Memory) -> str:
-        """Generate a direct output without using tools."""
-        image_info = self.get_image_info(image)
-
-        prompt_direct_output = f"""
-Task: Generate a direct response to the query without using any tools.
-
-Query: {question}
-Image: {image_info}
-
-Previous Steps and Their Results:
-{memory.get_actions()}
-
-Instructions:
-1. Review the original query and any accompanying inputs.
-2. Generate a direct response based on your knowledge.
-3. Ensure the response is clear and directly addresses the query.
-4. Include relevant details and explanations where necessary.
+    async def generate_final_output_stream(
+        self, question: str, image: str, memory: Memory
+    ) -> AsyncIterator[str]:
+        """Generate final output, yielding text chunks as they arrive.
+
+        Shares cache entries with generate_final_output.
+        """
+        logger.debug("Streaming final output")
+        logger.debug("Question: %s", question)
+
+        cache_key = None
+        if self.cache is not None:
+            cache_key = call_cache_key(
+                self.cache,
+                Planner.generate_final_output,
+                (self, question, image, memory),
+                {},
+            )
+            response = await self.cache.get(*cache_key)
+            if response is not None:
+                self.final_output = response
+                yield response
+                return
+
+        prompt = self._build_final_output_prompt(question, image, memory)
+
+        if not hasattr(self.llm_engine, "stream"):
+            # Engine cannot stream, deliver the whole response as one chunk
+            chunks = [
+                await self.llm_engine(prompt, system_prompt=_FINAL_OUTPUT_SYSTEM_PROMPT)
+            ]
+            yield chunks[0]
+        else:
+            logger.debug("Streaming from LLM engine for final output generation")
+            chunks = []
+            async for chunk in self.llm_engine.stream(
+                prompt, system_prompt=_FINAL_OUTPUT_SYSTEM_PROMPT
+            ):
+                chunks.append(chunk)
+                yield chunk
+
+        response = "".join(chunks)
+        logger.debug("Final output generated: %s", response)
+        self.final_output = response
+        if self.cache is not None and response:
+            await self.cache.set(*cache_key, response, ttl=24 * 60 * 60)
 
-Your response should:
-1. Be clear and concise
-2. Directly answer the query
-3. Be well-structured and easy to understand
+    @cached(ttl=24 * 60 * 60)
+    async def generate_direct_output(
+        self, question: str, image: str, memory: Memory
+    ) -> str:
+        """Generate a direct output without using tools."""
+        logger.debug("Generating direct output")
+        logger.debug("Question: %s", question)
 
-Please provide your response in a clear, structured format.
-"""
+        prompt = _DIRECT_OUTPUT_TEMPLATE.format(
+            question=question, image=image, actions=memory.get_actions_text()
+        )
 
-        input_data = [prompt_direct_output]
-        if image_info:
-            try:
-                with open(image_info["image_path"], "rb") as file:
-                    image_bytes = file.read()
-                input_data.append(image_bytes)
-            except Exception as e:
-                print(f"Error reading image file: {str(e)}")
+        logger.debug("Calling LLM engine for direct output generation")
+        response = await self.llm_engine(prompt)
+        logger.debug("Direct output generated: %s", response)
 
-        final_output = self.llm_engine(input_data)
-        return final_output
+        self.direct_output = response
+        return response
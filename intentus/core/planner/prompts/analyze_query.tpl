@@ -0,0 +1,4 @@
+
+Image: {image}
+
+Query: {question}
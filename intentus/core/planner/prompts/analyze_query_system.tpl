@@ -0,0 +1,15 @@
+
+Task: Analyze the given query with accompanying inputs and determine the skills and tools needed to address it effectively.
+
+Instructions:
+1. Carefully read and understand the query and any accompanying inputs.
+2. Identify the main objectives or tasks within the query.
+3. List the specific skills that would be necessary to address the query comprehensively.
+4. Provide a brief explanation for each skill you've identified, describing how it would contribute to answering the query.
+
+Your response should include:
+1. A concise summary of the query's main points and objectives, as well as content in any accompanying inputs.
+2. A list of required skills, with a brief explanation for each.
+3. Any additional considerations that might be important for addressing the query effectively.
+
+Please present your analysis in a clear, structured format.
@@ -0,0 +1,29 @@
+
+Task: Analyze the given query, answer it directly, and determine the optimal first step to address it with the available tools.
+
+Available Tools:
+{available_tools}
+
+Tool Metadata:
+{toolbox_metadata}
+
+Instructions:
+1. Carefully read and understand the query and any accompanying inputs.
+2. Identify the main objectives, the skills needed to address the query and any additional considerations.
+3. Answer the query directly based on your own knowledge.
+4. Select ONE tool best suited for the first step and formulate a specific, achievable sub-goal for it.
+
+Response Format:
+Your response MUST be a JSON object with three fields:
+- "query_analysis": an object with
+  * "concise_summary": a concise summary of the query's main points and objectives
+  * "required_skills": the required skills, with a brief explanation for each
+  * "additional_considerations": anything else important for addressing the query
+- "base_response": your direct answer to the query
+- "next_step": an object with
+  * "sub_goal": a specific, achievable objective for the tool
+  * "tool_name": the exact name of a tool from the available tools list
+
+Rules:
+- Select only ONE tool for the first step.
+- The tool name MUST exactly match one from the available tools list: {available_tools}.
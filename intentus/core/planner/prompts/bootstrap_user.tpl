@@ -0,0 +1,7 @@
+
+Context:
+Query: {question}
+Image: {image}
+
+Current Step: 0 in {max_step_count} steps
+Remaining Steps: {max_step_count}
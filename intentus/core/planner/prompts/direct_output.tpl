@@ -0,0 +1,21 @@
+
+Task: Generate a direct response to the query without using any tools.
+
+Query: {question}
+Image: {image}
+
+Previous Steps and Their Results:
+{actions}
+
+Instructions:
+1. Review the original query and any accompanying inputs.
+2. Generate a direct response based on your knowledge.
+3. Ensure the response is clear and directly addresses the query.
+4. Include relevant details and explanations where necessary.
+
+Your response should:
+1. Be clear and concise
+2. Directly answer the query
+3. Be well-structured and easy to understand
+
+Please provide your response in a clear, structured format.
@@ -0,0 +1,7 @@
+
+Context:
+Query: {question}
+Image: {image}
+
+Previous Steps and Their Results:
+{actions}
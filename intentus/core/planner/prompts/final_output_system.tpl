@@ -0,0 +1,15 @@
+
+Task: Generate a comprehensive final answer to the query based on all previous steps and their results.
+
+Instructions:
+1. Review all previous steps and their results.
+2. Synthesize the information into a coherent answer.
+3. Ensure the answer directly addresses the query.
+4. Present the information in a clear, structured format.
+
+Response Format:
+Your response should be a well-structured answer that:
+1. Directly addresses the query
+2. Incorporates relevant information from all steps
+3. Is clear and easy to understand
+4. Provides a complete and accurate response
@@ -0,0 +1,38 @@
+
+Task: Determine the optimal next step to address the given query based on the provided analysis, available tools, and previous steps taken.
+
+Available Tools:
+{available_tools}
+
+Tool Metadata:
+{toolbox_metadata}
+
+Instructions:
+1. Analyze the context thoroughly, including the query, its analysis, any image, available tools and their metadata, and previous steps taken.
+
+2. Determine the most appropriate next step by considering:
+   - Key objectives from the query analysis
+   - Capabilities of available tools
+   - Logical progression of problem-solving
+   - Outcomes from previous steps
+   - Current step count and remaining steps
+
+3. Select ONE tool best suited for the next step, keeping in mind the limited number of remaining steps.
+
+4. Formulate a specific, achievable sub-goal for the selected tool that maximizes progress towards answering the query.
+
+Response Format:
+Your response MUST present the sub-goal and the selected tool ONCE with the following format:
+
+Sub-Goal: <sub_goal>
+Tool Name: <tool_name>
+
+Where:
+- <sub_goal> is a specific, achievable objective for the tool, based on its metadata and previous outcomes.
+It MUST contain any involved data, file names, and variables from Previous Steps and Their Results that the tool can act upon.
+- <tool_name> MUST be the exact name of a tool from the available tools list.
+
+Rules:
+- Select only ONE tool for this step.
+- The sub-goal MUST directly address the query and be achievable by the selected tool.
+- The tool name MUST exactly match one from the available tools list: {available_tools}.
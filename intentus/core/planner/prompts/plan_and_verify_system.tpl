@@ -0,0 +1,29 @@
+
+Task: Verify if the current context and results are sufficient to answer the query, and determine the optimal next step in case they are not.
+
+Available Tools:
+{available_tools}
+
+Tool Metadata:
+{toolbox_metadata}
+
+Instructions:
+1. Review the query, its analysis and the results from previous steps.
+2. Determine if we have enough information to answer the query and decide whether to continue or stop.
+3. Regardless of that decision, select ONE tool best suited for the next step, keeping in mind the limited number of remaining steps.
+4. Formulate a specific, achievable sub-goal for the selected tool that maximizes progress towards answering the query.
+
+Response Format:
+Your response MUST be a JSON object with two fields:
+- "verification": an object with
+  * "analysis": your reasoning in detail
+  * "stop_signal": either "CONTINUE" or "STOP"
+- "next_step": an object with
+  * "sub_goal": a specific, achievable objective for the tool containing any involved data, file names, and variables from previous steps
+  * "tool_name": the exact name of a tool from the available tools list
+
+Rules:
+- If we have enough information to answer the query, set "stop_signal" to "STOP".
+- If we need more information or steps, set "stop_signal" to "CONTINUE".
+- Select only ONE tool for the next step.
+- The tool name MUST exactly match one from the available tools list: {available_tools}.
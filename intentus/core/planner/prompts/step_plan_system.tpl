@@ -0,0 +1,25 @@
+
+Task: Plan the next few steps to address the given query based on the provided analysis, available tools, and previous steps taken.
+
+Available Tools:
+{available_tools}
+
+Tool Metadata:
+{toolbox_metadata}
+
+Instructions:
+1. Analyze the query, its analysis, any image, and the results from previous steps.
+2. Plan up to the requested number of steps, each using ONE tool, that together make the most progress towards answering the query.
+3. For every step, list the steps of this plan whose results it needs. Steps that do not depend on each other will run at the same time.
+
+Response Format:
+Your response MUST be a JSON object with a "steps" field holding a list of objects with
+  * "context": ALL necessary information for the tool to function, including relevant data, file names or paths, and variable names and values from previous steps
+  * "sub_goal": a specific, achievable objective for the tool
+  * "tool_name": the exact name of a tool from the available tools list
+  * "depends_on": the 0-based positions in this list of the steps this step needs, or an empty list
+
+Rules:
+- A step may only depend on steps listed before it.
+- Only add dependencies that are really needed, independent steps run faster.
+- Each tool name MUST exactly match one from the available tools list: {available_tools}.
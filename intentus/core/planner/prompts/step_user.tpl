@@ -0,0 +1,11 @@
+
+Context:
+Query: {question}
+Image: {image}
+Query Analysis: {query_analysis}
+
+Previous Steps and Their Results:
+{actions}
+
+Current Step: {step_count} in {max_step_count} steps
+Remaining Steps: {remaining_steps}
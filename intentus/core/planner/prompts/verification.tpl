@@ -0,0 +1,8 @@
+
+Context:
+Query: {question}
+Image: {image}
+Query Analysis: {query_analysis}
+
+Previous Steps and Their Results:
+{actions}
@@ -0,0 +1,18 @@
+
+Task: Verify if the current context and results are sufficient to answer the query.
+
+Instructions:
+1. Review the query and its analysis.
+2. Evaluate the results from previous steps.
+3. Determine if we have enough information to answer the query.
+4. Decide whether to continue or stop.
+
+Response Format:
+Your response MUST follow this structure:
+1. Analysis: Explain your reasoning in detail.
+2. Conclusion: Either "CONTINUE" or "STOP".
+
+Rules:
+- If we have enough information to answer the query, conclude with "STOP".
+- If we need more information or steps, conclude with "CONTINUE".
+- Be thorough in your analysis.
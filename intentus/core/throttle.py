@@ -0,0 +1,95 @@
+import time
+import asyncio
+import logging
+from typing import Optional
+
+# Set up logging
+logger = logging.getLogger(__name__)
+
+try:
+    import tiktoken
+except ImportError:  # tiktoken is optional, fall back to a character heuristic
+    tiktoken = None
+
+
+def estimate_tokens(text: str, model: Optional[str] = None) -> int:
+    """Estimate the number of tokens in a prompt.
+
+    Uses tiktoken when it is installed and knows the model, otherwise assumes
+    roughly four characters per token.
+    """
+    if tiktoken is not None and model:
+        try:
+            return len(tiktoken.encoding_for_model(model).encode(text))
+        except KeyError:
+            pass
+    return len(text) // 4
+
+
+class DualTokenBucket:
+    """Client-side limiter for requests per minute and tokens per minute.
+
+    Both budgets start full and refill continuously in proportion to the
+    elapsed time. ``acquire`` waits until both budgets can cover the request
+    and then deducts from them, so calls are spaced out before the API has a
+    chance to answer with a 429.
+    """
+
+    def __init__(
+        self,
+        requests_per_minute: Optional[float] = None,
+        tokens_per_minute: Optional[float] = None,
+    ):
+        self.requests_per_minute = requests_per_minute
+        self.tokens_per_minute = tokens_per_minute
+        self.available_requests = requests_per_minute or 0.0
+        self.available_tokens = tokens_per_minute or 0.0
+        self._last_update = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        elapsed = now - self._last_update
+        self._last_update = now
+        if self.requests_per_minute:
+            self.available_requests = min(
+                self.available_requests + self.requests_per_minute * elapsed / 60.0,
+                self.requests_per_minute,
+            )
+        if self.tokens_per_minute:
+            self.available_tokens = min(
+                self.available_tokens + self.tokens_per_minute * elapsed / 60.0,
+                self.tokens_per_minute,
+            )
+
+    async def acquire(self, estimated_tokens: int = 0) -> None:
+        """Wait until there is budget for one request of ``estimated_tokens``."""
+        # Never ask for more than a full bucket, or the call would wait forever
+        if self.tokens_per_minute:
+            estimated_tokens = min(estimated_tokens, self.tokens_per_minute)
+
+        async with self._lock:
+            while True:
+                self._refill()
+                wait = 0.0
+                if self.requests_per_minute and self.available_requests < 1:
+                    wait = max(
+                        wait,
+                        (1 - self.available_requests) * 60.0 / self.requests_per_minute,
+                    )
+                if self.tokens_per_minute and self.available_tokens < estimated_tokens:
+                    wait = max(
+                        wait,
+                        (estimated_tokens - self.available_tokens)
+                        * 60.0
+                        / self.tokens_per_minute,
+                    )
+                if wait <= 0:
+                    break
+                logger.debug("Rate limit reached, waiting %.2fs", wait)
+                await asyncio.sleep(wait)
+
+            if self.requests_per_minute:
+                self.available_requests -= 1
+            if self.tokens_per_minute:
+                self.available_tokens -= estimated_tokens
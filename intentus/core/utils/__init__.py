@@ -1,9 +1,114 @@
+import os
+import re
+import sys
+import atexit
+import queue
 import logging
+import logging.handlers
+from typing import Any, Optional
+
 import colorlog
+import orjson
+
+# Background listener shared by every setup_logging() call
+_log_listener: Optional[logging.handlers.QueueListener] = None
+
+# Directories already created by ensure_dir() in this process
+_created_dirs = set()
+
+# Pieces of a JSON string field as it arrives in a streamed response
+_FIELD_VALUE_START_RE = re.compile(r'\s*:\s*"')
+_FIELD_PARTIAL_SEPARATOR_RE = re.compile(r"\s*(?::\s*)?")
+_STRING_BODY_RE = re.compile(r'((?:[^"\\]|\\.)*)"')
+
+
+class StreamingFieldExtractor:
+    """Incrementally extracts a string field from a streamed JSON response.
+
+    Each chunk is scanned once while looking for the field's key; after that
+    only the value is matched, so the work stays linear in the response size.
+    """
+
+    __slots__ = ("text", "_key", "_scan", "_value_start", "_done")
+
+    def __init__(self, field: str):
+        self.text = ""
+        self._key = f'"{field}"'
+        self._scan = 0  # where the next key search starts
+        self._value_start = None  # index just past the value's opening quote
+        self._done = False
+
+    def feed(self, chunk: str) -> Optional[str]:
+        """Add a chunk and return the decoded value once it is complete."""
+        self.text += chunk
+        if self._done:
+            return None
+
+        while self._value_start is None:
+            index = self.text.find(self._key, self._scan)
+            if index == -1:
+                # Keep the tail, which may hold the start of a split key
+                self._scan = max(self._scan, len(self.text) - len(self._key) + 1)
+                return None
+            after_key = index + len(self._key)
+            match = _FIELD_VALUE_START_RE.match(self.text, after_key)
+            if match is not None:
+                self._value_start = match.end()
+            elif _FIELD_PARTIAL_SEPARATOR_RE.fullmatch(self.text, after_key):
+                # The separator has not fully arrived yet
+                self._scan = index
+                return None
+            else:
+                # Not a key followed by a string, keep looking
+                self._scan = index + 1
+
+        match = _STRING_BODY_RE.match(self.text, self._value_start)
+        if match is None:
+            return None
+        self._done = True
+        return orjson.loads(f'"{match.group(1)}"')
+
+
+def install_uvloop() -> bool:
+    """Use uvloop (winloop on Windows) for asyncio.run() when it is installed.
+
+    Returns:
+        bool: Whether a faster event loop was installed
+    """
+    try:
+        if sys.platform == "win32":
+            import winloop as uvloop
+        else:
+            import uvloop
+    except ImportError:
+        return False
+    uvloop.install()
+    return True
 
 
-def setup_logging():
-    """Set up colored logging for the entire application."""
+def ensure_dir(path) -> str:
+    """Create a directory (and its parents) once per process and return its path."""
+    path = str(path)
+    if path not in _created_dirs:
+        os.makedirs(path, exist_ok=True)
+        _created_dirs.add(path)
+    return path
+
+
+def setup_logging(log_file: Optional[str] = None):
+    """Set up colored logging for the entire application.
+
+    Records are passed through a queue to a single background listener, so
+    formatting and stream/file writes happen off the event loop. Repeated
+    calls are no-ops.
+
+    Args:
+        log_file (str): Optional path of a file that also receives the logs
+    """
+    global _log_listener
+    if _log_listener is not None:
+        return
+
     handler = colorlog.StreamHandler()
     handler.setFormatter(
         colorlog.ColoredFormatter(
@@ -17,11 +122,42 @@ def setup_logging():
             },
         )
     )
+    handlers = [handler]
+
+    if log_file:
+        file_handler = logging.FileHandler(log_file)
+        file_handler.setFormatter(
+            logging.Formatter("%(asctime)s - %(name)s - %(levelname)s - %(message)s")
+        )
+        handlers.append(file_handler)
+
+    log_queue = queue.Queue(-1)
+    _log_listener = logging.handlers.QueueListener(
+        log_queue, *handlers, respect_handler_level=True
+    )
+    _log_listener.start()
+    atexit.register(_log_listener.stop)
 
     # Get the root logger and set its level
     root_logger = logging.getLogger()
     root_logger.setLevel(logging.DEBUG)
-    root_logger.addHandler(handler)
+    root_logger.addHandler(logging.handlers.QueueHandler(log_queue))
+
+
+class lazy_json:
+    """Log argument that pretty-prints ``obj`` as JSON only when rendered.
+
+    Use with %-style logging, e.g. ``logger.debug("Result: %s", lazy_json(x))``,
+    so the serialization is skipped when no handler accepts the record.
+    """
+
+    __slots__ = ("obj",)
+
+    def __init__(self, obj: Any):
+        self.obj = obj
+
+    def __str__(self) -> str:
+        return orjson.dumps(self.obj, default=str, option=orjson.OPT_INDENT_2).decode()
 
 
 def make_json_serializable(obj):
@@ -1,29 +1,46 @@
+import os
+import time
 import asyncio
-from intentus.core.utils import setup_logging
+import aiofiles
+import orjson
+from intentus.core.utils import ensure_dir, install_uvloop, setup_logging
 from intentus.core.agent import AgentConfig, IntentusAgent
 import logging
 
+OUTPUT_DIR = "example_outputs"
+MAX_CONCURRENT_TASKS = 2
 
-async def main():
-    # Set up logging
-    setup_logging()
+TASKS = [
+    {"question": "What is the capital of France?", "image": ""},
+    {"question": "Who wrote the novel Nineteen Eighty-Four?", "image": ""},
+]
 
-    # Create agent configuration
-    config = AgentConfig(
-        llm_engine="gpt-4.1-mini",
-        enabled_tools=["Wikipedia_Knowledge_Searcher_Tool"],
-        verbose=True,
-        max_steps=5,
-        temperature=0.7,
+
+def output_path(task_id: int) -> str:
+    return os.path.join(
+        ensure_dir(OUTPUT_DIR), f"result_{task_id}_{int(time.time())}.ndjson"
     )
 
-    # Create agent
-    agent = IntentusAgent(config)
 
-    # Run agent
-    result = await agent.run(question="What is the capital of France?", image="")
+async def write_token(f, chunk: str) -> None:
+    """Append a chunk of the final output to an open NDJSON result file."""
+    await f.write(orjson.dumps({"final_output_chunk": chunk}) + b"\n")
+
+
+async def save_result(f, result: dict) -> None:
+    """Append a run result to an open NDJSON file without blocking the event loop.
 
-    # Print results
+    One line holds the result without its memory, followed by one line per
+    memory action, so long traces are never serialized in one piece.
+    """
+    summary = {key: value for key, value in result.items() if key != "memory"}
+    await f.write(orjson.dumps(summary, default=str) + b"\n")
+    for action in result["memory"]:
+        await f.write(orjson.dumps(action, default=str) + b"\n")
+
+
+def print_result(task_id: int, result: dict) -> None:
+    print(f"\n==> Task {task_id}")
     print("\nQuery Analysis:")
     print(result["query_analysis"])
     print("\nBase Response:")
@@ -37,7 +54,52 @@ async def main():
         print(f"- {action}")
 
 
+async def main():
+    # Set up logging
+    setup_logging(log_file="example.log")
+
+    # Create agent configuration
+    config = AgentConfig(
+        llm_engine="gpt-4.1-mini",
+        enabled_tools=["Wikipedia_Knowledge_Searcher_Tool"],
+        verbose=True,
+        max_steps=5,
+        temperature=0.7,
+    )
+
+    # Create the agent once; every run gets its own memory
+    async with IntentusAgent(config) as agent:
+        semaphore = asyncio.Semaphore(MAX_CONCURRENT_TASKS)
+
+        async def run_one(task_id: int, task: dict) -> dict:
+            # The final output is streamed into the result file as it arrives
+            output_file = output_path(task_id)
+            async with aiofiles.open(output_file, "wb") as f:
+                async with semaphore:
+                    result = await agent.run(
+                        question=task["question"],
+                        image=task["image"],
+                        on_token=lambda chunk: write_token(f, chunk),
+                    )
+                await save_result(f, result)
+            print_result(task_id, result)
+            print(f"\nResults saved to: {output_file}")
+            return result
+
+        # Run agent on all tasks concurrently
+        results = await asyncio.gather(
+            *[run_one(i, task) for i, task in enumerate(TASKS, 1)],
+            return_exceptions=True,
+        )
+        await agent.close_shared_clients()
+
+    for task_id, result in enumerate(results, 1):
+        if isinstance(result, Exception):
+            logging.error(f"Task {task_id} failed: {str(result)}")
+
+
 if __name__ == "__main__":
+    install_uvloop()
     try:
         asyncio.run(main())
     except KeyboardInterrupt:
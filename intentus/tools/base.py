@@ -2,6 +2,23 @@
 import logging
 
 
+def cache_policy(ttl=None, enabled=True):
+    """
+    Class decorator that sets how the executor caches a tool's results.
+
+    Parameters:
+        ttl (float): Seconds before a cached result expires (None keeps it forever).
+        enabled (bool): Whether results may be cached at all; disable for non-deterministic tools.
+    """
+
+    def decorator(cls):
+        cls.cache_results = enabled
+        cls.cache_ttl = ttl
+        return cls
+
+    return decorator
+
+
 class BaseTool:
     """
     A base class for building tool classes that perform specific tasks, such as image processing or text detection.
@@ -10,6 +27,10 @@ class BaseTool:
     require_llm_engine = (
         False  # Default is False, tools that need LLM should set this to True
     )
+    cache_results = True  # Whether the executor may reuse results for identical commands
+    cache_ttl = None  # Seconds before a cached result expires (None keeps it forever)
+    reusable = True  # Whether one instance may serve every command (False for stateful tools)
+    async_safe = True  # Whether one instance may run several commands concurrently
 
     def __init__(
         self,
@@ -47,16 +68,8 @@ class BaseTool:
         self.user_metadata = user_metadata
         self.model_string = model_string
 
-        # Initialize logger
+        # Initialize logger; output is handled by the application's root handlers
         self.logger = logging.getLogger(self.__class__.__name__)
-        if not self.logger.handlers:
-            handler = logging.StreamHandler()
-            formatter = logging.Formatter(
-                "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
-            )
-            handler.setFormatter(formatter)
-            self.logger.addHandler(handler)
-            self.logger.setLevel(logging.DEBUG)
 
     def set_metadata(
         self,
@@ -108,6 +121,41 @@ class BaseTool:
             metadata["user_metadata"] = self.user_metadata
         return metadata
 
+    def should_cache(self, result):
+        """
+        Whether the executor may cache a result of this tool.
+
+        Failed executions are not cached so they can be retried; tools whose
+        errors do not set "success": False override this.
+
+        Parameters:
+            result: The value returned by execute().
+        """
+        return not (isinstance(result, dict) and result.get("success") is False)
+
+    async def warm_up(self):
+        """
+        Prepare expensive resources (models, clients, processes) ahead of the first command.
+
+        Called at most once per reusable instance when the agent expects the tool
+        to be used soon; the default does nothing.
+        """
+
+    async def aclose(self):
+        """
+        Release the resources acquired by warm_up() or execute(), e.g. on shutdown.
+
+        The default does nothing.
+        """
+
+    @classmethod
+    async def close_client(cls):
+        """
+        Close clients shared by every instance of the tool, on application shutdown.
+
+        Unlike aclose(), this affects all agents in the process. The default does nothing.
+        """
+
     def set_custom_output_dir(self, output_dir):
         """
         Set a custom output directory for the tool.
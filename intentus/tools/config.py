@@ -1,9 +1,13 @@
-from typing import Dict, Any, List, Optional
+import sys
+from typing import Dict, Any, FrozenSet, Optional, Tuple
 from dataclasses import dataclass, field
 from pathlib import Path
 
+# dataclass(slots=True) is only available from Python 3.10
+_DATACLASS_SLOTS = {"slots": True} if sys.version_info >= (3, 10) else {}
 
-@dataclass
+
+@dataclass(**_DATACLASS_SLOTS)
 class ToolMetadata:
     """Metadata for a tool."""
 
@@ -12,12 +16,12 @@ class ToolMetadata:
     version: str
     input_schema: Dict[str, Any]
     output_schema: Dict[str, Any]
-    examples: List[Dict[str, Any]] = field(default_factory=list)
+    examples: Tuple[Dict[str, Any], ...] = ()
     author: Optional[str] = None
-    tags: List[str] = field(default_factory=list)
+    tags: Tuple[str, ...] = ()
 
 
-@dataclass
+@dataclass(**_DATACLASS_SLOTS)
 class ToolConfig:
     """Configuration for a specific tool."""
 
@@ -29,23 +33,37 @@ class ToolConfig:
     cache_ttl: int = 3600  # 1 hour
 
 
-@dataclass
+@dataclass(**_DATACLASS_SLOTS)
 class ToolboxConfig:
     """Configuration for the entire toolbox."""
 
     tools_dir: Path = Path("tools")
-    enabled_tools: List[str] = field(default_factory=lambda: ["all"])
+    enabled_tools: Tuple[str, ...] = ("all",)
     default_timeout: int = 30
     default_retry_attempts: int = 3
     tool_configs: Dict[str, ToolConfig] = field(default_factory=dict)
-    custom_tool_paths: List[Path] = field(default_factory=list)
+    custom_tool_paths: Tuple[Path, ...] = ()
+    # enabled_tools together with its lookup set, rebuilt whenever
+    # enabled_tools is reassigned
+    _enabled_cache: Optional[Tuple[Tuple[str, ...], FrozenSet[str]]] = field(
+        init=False, repr=False, compare=False, default=None
+    )
+
+    @property
+    def _enabled_set(self) -> FrozenSet[str]:
+        cached = self._enabled_cache
+        if cached is None or cached[0] is not self.enabled_tools:
+            cached = (self.enabled_tools, frozenset(self.enabled_tools))
+            self._enabled_cache = cached
+        return cached[1]
 
     def get_tool_config(self, tool_name: str) -> ToolConfig:
         """Get configuration for a specific tool."""
-        return self.tool_configs.get(tool_name, ToolConfig())
+        config = self.tool_configs.get(tool_name)
+        # A fresh default each time, so changing one cannot affect other tools
+        return config if config is not None else ToolConfig()
 
     def is_tool_enabled(self, tool_name: str) -> bool:
         """Check if a tool is enabled."""
-        if "all" in self.enabled_tools:
-            return True
-        return tool_name in self.enabled_tools
+        enabled = self._enabled_set
+        return "all" in enabled or tool_name in enabled
@@ -1,15 +1,40 @@
 import os
-import aiohttp
-from typing import List, Dict, Any
+import time
+import asyncio
+import httpx
+import orjson
+from collections import OrderedDict
+from typing import ClassVar, List, Dict, Any, Optional, Tuple, Union
 from dataclasses import dataclass
+from pydantic import BaseModel, Field
 
-from intentus.tools.base import BaseTool
+from intentus.tools.base import BaseTool, cache_policy
 
 from dotenv import load_dotenv
 
 load_dotenv()
 
 
+class SearchCommand(BaseModel):
+    """Arguments of a Google search."""
+
+    query: str
+    # Custom Search serves at most the first 100 results
+    num_results: int = Field(5, ge=1, le=100)
+
+    @classmethod
+    def parse(cls, command: Union[str, Dict[str, Any], "SearchCommand"]) -> "SearchCommand":
+        """Validate a command given as a model, a dict, a JSON object or a bare query."""
+        if isinstance(command, cls):
+            return command
+        if isinstance(command, dict):
+            return cls.model_validate(command)
+        if command.lstrip().startswith("{"):
+            return cls.model_validate_json(command)
+        return cls(query=command.strip())
+
+
+@cache_policy(ttl=60 * 60)
 @dataclass
 class Google_Search_Tool(BaseTool):
     """Tool for performing Google searches."""
@@ -18,15 +43,24 @@ class Google_Search_Tool(BaseTool):
     description: str = "A tool for performing Google searches and retrieving results"
     version: str = "1.0.0"
 
+    # One HTTP/2 client for every instance, bound to the loop it was made in
+    _client: ClassVar[Optional[httpx.AsyncClient]] = None
+    _client_loop: ClassVar[Optional[asyncio.AbstractEventLoop]] = None
+    # (query, num_results) -> (expiry timestamp, result), least recently used first
+    _results: ClassVar["OrderedDict[Tuple[str, int], Tuple[float, Dict[str, Any]]]"] = (
+        OrderedDict()
+    )
+    _results_maxsize: ClassVar[int] = 256
+    # Searches currently awaiting a response, keyed like _results
+    _inflight: ClassVar[Dict[Tuple[str, int], "asyncio.Future"]] = {}
+
     def __init__(self):
         super().__init__()
         self.api_key = os.getenv("GOOGLE_API_KEY")
         self.cx = os.getenv("GOOGLE_CX")
         self.base_url = "https://www.googleapis.com/customsearch/v1"
-
-    def get_metadata(self) -> Dict[str, Any]:
-        """Get tool metadata."""
-        return {
+        # Static, so built once; the initializer serializes it once in turn
+        self._metadata = {
             "name": self.name,
             "description": self.description,
             "version": self.version,
@@ -59,7 +93,104 @@ class Google_Search_Tool(BaseTool):
             },
         }
 
-    async def execute(self, command: str) -> Dict[str, Any]:
+    def get_metadata(self) -> Dict[str, Any]:
+        """Get tool metadata."""
+        return self._metadata
+
+    @classmethod
+    def _get_client(cls) -> httpx.AsyncClient:
+        """Return the shared client, creating it for the running loop if needed.
+
+        Concurrent searches are multiplexed over one HTTP/2 connection.
+        """
+        loop = asyncio.get_running_loop()
+        if cls._client is None or cls._client.is_closed or cls._client_loop is not loop:
+            cls._client = httpx.AsyncClient(
+                http2=True,
+                limits=httpx.Limits(max_connections=100, max_keepalive_connections=20),
+                timeout=15.0,
+            )
+            cls._client_loop = loop
+        return cls._client
+
+    @classmethod
+    async def close_client(cls):
+        """Close the client shared by every instance, on application shutdown."""
+        if cls._client is not None and not cls._client.is_closed:
+            await cls._client.aclose()
+        cls._client = None
+        cls._client_loop = None
+
+    async def warm_up(self):
+        self._get_client()
+
+    def _cached_result(self, key: Tuple[str, int]) -> Optional[Dict[str, Any]]:
+        entry = self._results.get(key)
+        if entry is None:
+            return None
+        expire_at, result = entry
+        if expire_at <= time.time():
+            del self._results[key]
+            return None
+        self._results.move_to_end(key)
+        return result
+
+    def _cache_result(self, key: Tuple[str, int], result: Dict[str, Any]):
+        ttl = self.cache_ttl if self.cache_ttl is not None else float("inf")
+        self._results[key] = (time.time() + ttl, result)
+        self._results.move_to_end(key)
+        if len(self._results) > self._results_maxsize:
+            self._results.popitem(last=False)
+
+    async def _fetch_page(self, query: str, start: int, num: int) -> Dict[str, Any]:
+        params = {
+            "q": query,
+            "key": self.api_key,
+            "cx": self.cx,
+            "num": num,
+            "start": start,
+        }
+        response = await self._get_client().get(self.base_url, params=params)
+        return orjson.loads(response.content)
+
+    async def _search(self, query: str, num_results: int) -> Dict[str, Any]:
+        # The API returns at most 10 results per request, so larger searches
+        # fetch every page at once over the shared HTTP/2 connection
+        pages = await asyncio.gather(
+            *[
+                self._fetch_page(query, start + 1, min(10, num_results - start))
+                for start in range(0, num_results, 10)
+            ]
+        )
+        items = [item for page in pages for item in page.get("items", [])]
+
+        if items:
+            result = {
+                "success": True,
+                "error": None,
+                "result": {
+                    "results": [
+                        {
+                            "title": item["title"],
+                            "link": item["link"],
+                            "snippet": item["snippet"],
+                        }
+                        for item in items
+                    ]
+                },
+            }
+            self._cache_result((query, num_results), result)
+            return result
+        else:
+            return {
+                "success": False,
+                "error": "No results found.",
+                "result": None,
+            }
+
+    async def execute(
+        self, command: Union[str, Dict[str, Any], SearchCommand]
+    ) -> Dict[str, Any]:
         """Execute the Google search."""
         if not self.api_key:
             return {
@@ -69,42 +200,22 @@ class Google_Search_Tool(BaseTool):
             }
 
         try:
-            # Parse the command to get query and num_results
-            # For now, just use the command as the query
-            query = command
-            num_results = 5
-
-            async with aiohttp.ClientSession() as session:
-                params = {
-                    "q": query,
-                    "key": self.api_key,
-                    "cx": self.cx,
-                    "num": num_results,
-                }
-                async with session.get(self.base_url, params=params) as response:
-                    results = await response.json()
-
-                    if "items" in results:
-                        return {
-                            "success": True,
-                            "error": None,
-                            "result": {
-                                "results": [
-                                    {
-                                        "title": item["title"],
-                                        "link": item["link"],
-                                        "snippet": item["snippet"],
-                                    }
-                                    for item in results["items"]
-                                ]
-                            },
-                        }
-                    else:
-                        return {
-                            "success": False,
-                            "error": "No results found.",
-                            "result": None,
-                        }
+            search = SearchCommand.parse(command)
+            query, num_results = search.query, search.num_results
+
+            # Repeated queries within cache_ttl are answered without a request
+            key = (query, num_results)
+            cached = self._cached_result(key)
+            if cached is not None:
+                return cached
+
+            # Identical concurrent searches share a single request
+            request = self._inflight.get(key)
+            if request is None:
+                request = asyncio.ensure_future(self._search(query, num_results))
+                self._inflight[key] = request
+                request.add_done_callback(lambda _: self._inflight.pop(key, None))
+            return await asyncio.shield(request)
         except Exception as e:
             return {
                 "success": False,
@@ -113,6 +224,9 @@ class Google_Search_Tool(BaseTool):
             }
 
 
+TOOL_CLASS = Google_Search_Tool
+
+
 if __name__ == "__main__":
     # Test command:
     """
@@ -1,11 +1,36 @@
 import os
-import wikipedia
-from ..base import BaseTool
+import time
+import asyncio
+import httpx
+import orjson
+from ..base import BaseTool, cache_policy
 import json
 from dataclasses import dataclass
-from typing import Dict, Any, List, Tuple, Optional
+from collections import OrderedDict
+from typing import ClassVar, Dict, Any, List, Tuple, Optional, Union
+from pydantic import BaseModel, Field
 
 
+class SearchCommand(BaseModel):
+    """Arguments of a Wikipedia search."""
+
+    query: str
+    # Falls back to the tool's max_length
+    max_length: Optional[int] = Field(None, ge=1)
+
+    @classmethod
+    def parse(cls, command: Union[str, Dict[str, Any], "SearchCommand"]) -> "SearchCommand":
+        """Validate a command given as a model, a dict, a JSON object or a bare query."""
+        if isinstance(command, cls):
+            return command
+        if isinstance(command, dict):
+            return cls.model_validate(command)
+        if command.lstrip().startswith("{"):
+            return cls.model_validate_json(command)
+        return cls(query=command.strip())
+
+
+@cache_policy(ttl=float(os.getenv("WIKI_CACHE_TTL", 24 * 60 * 60)))
 @dataclass
 class Wikipedia_Knowledge_Searcher_Tool(BaseTool):
     """
@@ -13,6 +38,19 @@ class Wikipedia_Knowledge_Searcher_Tool(BaseTool):
     The input should be a simple keyword or search term, not a full sentence or question.
     """
 
+    # One HTTP/2 client for every instance, bound to the loop it was made in
+    _client: ClassVar[Optional[httpx.AsyncClient]] = None
+    _client_loop: ClassVar[Optional[asyncio.AbstractEventLoop]] = None
+    # (query, max_length) -> (expiry timestamp, result), least recently used first
+    _results: ClassVar["OrderedDict[Tuple[str, int], Tuple[float, Dict[str, Any]]]"] = (
+        OrderedDict()
+    )
+    _results_maxsize: ClassVar[int] = 1024
+    # Searches currently awaiting a response, keyed like _results
+    _inflight: ClassVar[Dict[Tuple[str, int], "asyncio.Future"]] = {}
+    # Largest exchars the TextExtracts API accepts
+    _EXCHARS_MAX: ClassVar[int] = 1200
+
     def __init__(self):
         super().__init__(
             tool_name="Wikipedia_Knowledge_Searcher_Tool",
@@ -50,12 +88,125 @@ class Wikipedia_Knowledge_Searcher_Tool(BaseTool):
             },
         )
         self.max_length = 2000
-        wikipedia.set_lang("en")
 
-    def search_wikipedia(self, query: str, max_length: int = 2000) -> Dict[str, Any]:
+    @classmethod
+    def _get_client(cls) -> httpx.AsyncClient:
+        """Return the shared MediaWiki API client, creating it if needed."""
+        loop = asyncio.get_running_loop()
+        if cls._client is None or cls._client.is_closed or cls._client_loop is not loop:
+            cls._client = httpx.AsyncClient(
+                http2=True,
+                base_url="https://en.wikipedia.org/w/",
+                # Wikimedia throttles or rejects requests with generic user agents
+                headers={
+                    "User-Agent": "Intentus/0.1 (https://github.com/Perceptus-Labs/Intentus)"
+                },
+                limits=httpx.Limits(max_keepalive_connections=20),
+                timeout=10.0,
+            )
+            cls._client_loop = loop
+        return cls._client
+
+    @classmethod
+    async def close_client(cls):
+        """Close the client shared by every instance, on application shutdown."""
+        if cls._client is not None and not cls._client.is_closed:
+            await cls._client.aclose()
+        cls._client = None
+        cls._client_loop = None
+
+    async def warm_up(self):
+        self._get_client()
+
+    async def _api(self, **params) -> Dict[str, Any]:
+        response = await self._get_client().get(
+            "api.php", params={"format": "json", "formatversion": 2, **params}
+        )
+        response.raise_for_status()
+        return orjson.loads(response.content)
+
+    def _cached_result(self, key: Tuple[str, int]) -> Optional[Dict[str, Any]]:
+        entry = self._results.get(key)
+        if entry is None:
+            return None
+        expire_at, result = entry
+        if expire_at <= time.time():
+            del self._results[key]
+            return None
+        self._results.move_to_end(key)
+        return result
+
+    def _cache_result(self, key: Tuple[str, int], result: Dict[str, Any]):
+        ttl = self.cache_ttl if self.cache_ttl is not None else float("inf")
+        self._results[key] = (time.time() + ttl, result)
+        self._results.move_to_end(key)
+        if len(self._results) > self._results_maxsize:
+            self._results.popitem(last=False)
+
+    def should_cache(self, result: Dict[str, Any]) -> bool:
+        # Errors and empty searches carry no search results and are retried
+        return super().should_cache(result) and bool(result.get("search_results"))
+
+    async def _fetch(self, query: str, max_length: int) -> Dict[str, Any]:
+        # One generator=search request returns the top hits together with
+        # their plain-text intros (full-text extracts are limited to one page)
+        params = dict(
+            action="query",
+            generator="search",
+            gsrsearch=query,
+            gsrlimit=5,
+            prop="extracts|pageprops",
+            ppprop="disambiguation",
+            exintro=1,
+            explaintext=1,
+            exlimit=5,
+        )
+        if max_length <= self._EXCHARS_MAX:
+            # Let the API truncate so no more text than needed is downloaded
+            params["exchars"] = max_length
+        data = await self._api(**params)
+        # Generated pages come back unordered, "index" is the search rank
+        pages = sorted(
+            data.get("query", {}).get("pages", []), key=lambda p: p.get("index", 0)
+        )
+        search_results = [page["title"] for page in pages]
+        self.logger.debug(f"Search results: {search_results}")
+
+        if not pages:
+            return {
+                "search_results": [],
+                "content": f"No results found for query: {query}",
+            }
+
+        page = pages[0]
+        extract = page.get("extract") or ""
+        if "disambiguation" in page.get("pageprops", {}):
+            # The intro of a disambiguation page holds no options, so offer the
+            # other hits instead
+            options = search_results[1:]
+            return {
+                "search_results": search_results,
+                "content": f"Disambiguation page. Options: {', '.join(options)}",
+            }
+        if not extract:
+            return {
+                "search_results": search_results,
+                "content": f"Page not found for: {page.get('title', search_results[0])}",
+            }
+        return {
+            "search_results": search_results,
+            "content": extract[:max_length],
+        }
+
+    async def search_wikipedia(
+        self, query: str, max_length: int = 2000
+    ) -> Dict[str, Any]:
         """
         Search Wikipedia for a given query and return relevant content.
 
+        Results are kept in memory for cache_ttl seconds, and identical
+        concurrent searches share one API request.
+
         Args:
             query (str): The search query
             max_length (int): Maximum length of the returned text
@@ -63,51 +214,38 @@ class Wikipedia_Knowledge_Searcher_Tool(BaseTool):
         Returns:
             Dict[str, Any]: A dictionary containing search results and content
         """
+        key = (query, max_length)
+        cached = self._cached_result(key)
+        if cached is not None:
+            return cached
+
         self.logger.debug(f"Searching Wikipedia with query: {query}")
         try:
-            # Search for the query
-            search_results = wikipedia.search(query)
-            self.logger.debug(f"Search results: {search_results}")
-
-            if not search_results:
-                return {
-                    "search_results": [],
-                    "content": f"No results found for query: {query}",
-                }
-
-            # Get the content of the first result
-            try:
-                page = wikipedia.page(search_results[0])
-                content = page.content[:max_length]
-                return {
-                    "search_results": search_results,
-                    "content": content,
-                }
-            except wikipedia.exceptions.DisambiguationError as e:
-                # If the page is a disambiguation page, return the options
-                return {
-                    "search_results": search_results,
-                    "content": f"Disambiguation page. Options: {', '.join(e.options)}",
-                }
-            except wikipedia.exceptions.PageError:
-                return {
-                    "search_results": search_results,
-                    "content": f"Page not found for: {search_results[0]}",
-                }
-
+            request = self._inflight.get(key)
+            if request is None:
+                request = asyncio.ensure_future(self._fetch(query, max_length))
+                self._inflight[key] = request
+                request.add_done_callback(lambda _: self._inflight.pop(key, None))
+            result = await asyncio.shield(request)
         except Exception as e:
             self.logger.error(f"Error searching Wikipedia: {str(e)}")
             return {
                 "search_results": [],
                 "content": f"Error searching Wikipedia: {str(e)}",
             }
+        if self.should_cache(result):
+            self._cache_result(key, result)
+        return result
 
-    async def execute(self, command: str) -> Dict[str, Any]:
+    async def execute(
+        self, command: Union[str, Dict[str, Any], SearchCommand]
+    ) -> Dict[str, Any]:
         """
         Execute the Wikipedia search tool.
 
         Args:
-            command (str): The search query or command to execute
+            command (str | dict | SearchCommand): A search term, or a JSON object
+                with "query" and optionally "max_length"
 
         Returns:
             Dict[str, Any]: The search results and content
@@ -115,12 +253,13 @@ class Wikipedia_Knowledge_Searcher_Tool(BaseTool):
         self.logger.debug(f"Executing Wikipedia search with command: {command}")
 
         try:
-            # Extract the search query from the command
-            # The command should be a simple keyword or search term
-            search_query = command.strip()
+            # The command is usually a simple keyword or search term
+            search = SearchCommand.parse(command)
 
             # Perform the search
-            results = self.search_wikipedia(search_query)
+            results = await self.search_wikipedia(
+                search.query, search.max_length or self.max_length
+            )
             self.logger.debug(
                 f"Search completed. Found {len(results['search_results'])} results"
             )
@@ -137,10 +276,11 @@ class Wikipedia_Knowledge_Searcher_Tool(BaseTool):
             }
 
 
+TOOL_CLASS = Wikipedia_Knowledge_Searcher_Tool
+
+
 if __name__ == "__main__":
     # Example usage
-    import asyncio
-
     async def main():
         tool = Wikipedia_Knowledge_Searcher_Tool()
 
@@ -162,4 +302,6 @@ if __name__ == "__main__":
             print("Result:")
             print(result)
 
+        await tool.close_client()
+
     asyncio.run(main())
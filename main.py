@@ -1,6 +1,10 @@
 import asyncio
+import hmac
+import importlib.util
 import os
+import time
 import logging
+from contextlib import asynccontextmanager
 from typing import Optional
 from fastapi import FastAPI, HTTPException, Depends, Header
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
@@ -16,8 +20,23 @@ from intentus.core.agent import AgentConfig, IntentusAgent
 setup_logging()
 logger = logging.getLogger(__name__)
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Build and warm up the agent at startup, close it and the shared clients on shutdown"""
+    global agent, _expected_api_key
+    # Re-read the key so a restart of the app picks up a rotated secret
+    _expected_api_key = os.getenv("ORCHESTRATOR_API_KEY")
+    agent = create_agent()
+    # Open tool sessions now rather than on the first request
+    agent.executor.warm_up_tools(agent.available_tools)
+    yield
+    await agent.aclose()
+    await agent.close_shared_clients()
+    agent = None
+
+
 # Initialize FastAPI app
-app = FastAPI(title="Intentus Orchestrator", version="1.0.0")
+app = FastAPI(title="Intentus Orchestrator", version="1.0.0", lifespan=lifespan)
 
 # Add CORS middleware
 app.add_middleware(
@@ -30,6 +49,7 @@ app.add_middleware(
 
 # Security
 security = HTTPBearer()
+_expected_api_key: Optional[str] = os.getenv("ORCHESTRATOR_API_KEY")
 
 
 # Pydantic models for request/response
@@ -58,18 +78,22 @@ class AgentResponse(BaseModel):
 agent: Optional[IntentusAgent] = None
 
 
+def create_agent() -> IntentusAgent:
+    """Create the agent that serves every request"""
+    config = AgentConfig(
+        llm_engine="gpt-4.1-mini",
+        enabled_tools=["Wikipedia_Knowledge_Searcher_Tool"],
+        verbose=True,
+        max_steps=5,
+        temperature=0.7,
+    )
+    return IntentusAgent(config)
+
+
 def get_agent() -> IntentusAgent:
-    """Get or create the global agent instance"""
-    global agent
+    """Get the global agent instance built at startup"""
     if agent is None:
-        config = AgentConfig(
-            llm_engine="gpt-4.1-mini",
-            enabled_tools=["Wikipedia_Knowledge_Searcher_Tool"],
-            verbose=True,
-            max_steps=5,
-            temperature=0.7,
-        )
-        agent = IntentusAgent(config)
+        raise RuntimeError("Agent is not initialized, the app has not started")
     return agent
 
 
@@ -77,45 +101,39 @@ def verify_api_key(
     credentials: HTTPAuthorizationCredentials = Depends(security),
 ) -> bool:
     """Verify the API key from the Authorization header"""
-    expected_api_key = os.getenv("ORCHESTRATOR_API_KEY")
-    if not expected_api_key:
+    if not _expected_api_key:
         logger.warning("ORCHESTRATOR_API_KEY not set, skipping authentication")
         return True
 
-    if credentials.credentials != expected_api_key:
+    # Constant-time compare so the key cannot be guessed from response timing
+    if not hmac.compare_digest(
+        credentials.credentials.encode(), _expected_api_key.encode()
+    ):
         raise HTTPException(status_code=401, detail="Invalid API key")
     return True
 
 
 def format_context_for_agent(intention_result: IntentionResult) -> str:
     """Format the intention result into a text context for the agent"""
-    context_parts = []
-
-    # Add session info
-    context_parts.append(f"Session ID: {intention_result.session_id}")
-
-    # Add intention details
-    context_parts.append(f"Intention Type: {intention_result.intention_type}")
-    context_parts.append(f"Description: {intention_result.description}")
-    context_parts.append(f"Confidence: {intention_result.confidence:.2f}")
-
-    # Add transcript
-    if intention_result.transcript:
-        context_parts.append(f"Transcript: {intention_result.transcript}")
-
-    # Add environment context if available
-    if intention_result.environment_context:
-        context_parts.append(
-            f"Environment Context: {intention_result.environment_context}"
+    ir = intention_result
+    # Optional parts (transcript, environment context) are dropped when empty
+    return "\n".join(
+        filter(
+            None,
+            (
+                f"Session ID: {ir.session_id}",
+                f"Intention Type: {ir.intention_type}",
+                f"Description: {ir.description}",
+                f"Confidence: {ir.confidence:.2f}",
+                f"Transcript: {ir.transcript}" if ir.transcript else None,
+                f"Environment Context: {ir.environment_context}"
+                if ir.environment_context
+                else None,
+                "Timestamp: "
+                + time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(ir.timestamp)),
+            ),
         )
-
-    # Add timestamp
-    timestamp_str = datetime.fromtimestamp(intention_result.timestamp).strftime(
-        "%Y-%m-%d %H:%M:%S"
     )
-    context_parts.append(f"Timestamp: {timestamp_str}")
-
-    return "\n".join(context_parts)
 
 
 @app.post("/orchestrate", response_model=AgentResponse)
@@ -146,9 +164,11 @@ async def orchestrate_intention(
 
         logger.info(f"Agent completed successfully in {result['execution_time']:.2f}s")
 
-        return AgentResponse(
+        # Fields come straight from the agent, so skip validating them again
+        qa = result["query_analysis"]
+        return AgentResponse.model_construct(
             success=True,
-            query_analysis=result["query_analysis"],
+            query_analysis=None if qa is None else str(qa).strip(),
             base_response=result["base_response"],
             final_output=result["final_output"],
             execution_time=result["execution_time"],
@@ -185,8 +205,25 @@ if __name__ == "__main__":
     # Get configuration from environment
     host = os.getenv("ORCHESTRATOR_HOST", "0.0.0.0")
     port = int(os.getenv("ORCHESTRATOR_PORT", "8000"))
-
-    logger.info(f"Starting Intentus Orchestrator on {host}:{port}")
+    # Each worker process builds its own agent and connection pools in lifespan
+    workers = int(os.getenv("ORCHESTRATOR_WORKERS", "1"))
+    # uvloop and httptools come with the "speedups" extra
+    loop = "uvloop" if importlib.util.find_spec("uvloop") else "asyncio"
+    http = "httptools" if importlib.util.find_spec("httptools") else "h11"
+
+    logger.info(
+        f"Starting Intentus Orchestrator on {host}:{port} "
+        f"({workers} worker(s), {loop} loop, {http} parser)"
+    )
 
     # Run the server
-    uvicorn.run("main:app", host=host, port=port, reload=False, log_level="info")
+    uvicorn.run(
+        "main:app",
+        host=host,
+        port=port,
+        loop=loop,
+        http=http,
+        workers=workers,
+        reload=False,
+        log_level="info",
+    )
@@ -11,6 +11,13 @@ setup(
     version="0.1.0",
     packages=find_packages(),
     install_requires=read_requirements("requirements.txt"),
+    extras_require={
+        "speedups": [
+            'uvloop; platform_system != "Windows"',
+            'winloop; platform_system == "Windows"',
+            "httptools",
+        ],
+    },
     author="Haohan Wang",
     author_email="haohanw@eecs.berkeley.edu",
     description="An SDK for robotics interaction with audio and video processing capabilities",
@@ -29,6 +36,6 @@ setup(
     python_requires=">=3.8",
     include_package_data=True,
     package_data={
-        "intentus": ["py.typed"],
+        "intentus": ["py.typed", "core/planner/prompts/*.tpl"],
     },
 )
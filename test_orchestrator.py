@@ -11,6 +11,18 @@ from datetime import datetime
 ORCHESTRATOR_URL = "http://localhost:8000/orchestrate"
 API_KEY = "test-api-key"  # Set this to match your ORCHESTRATOR_API_KEY
 
+# One pooled session so repeated calls reuse keep-alive connections
+_session = requests.Session()
+_session.headers.update(
+    {
+        "Content-Type": "application/json",
+        "Authorization": f"Bearer {API_KEY}",
+    }
+)
+_session.mount(
+    "http://", requests.adapters.HTTPAdapter(pool_connections=10, pool_maxsize=50)
+)
+
 
 def test_orchestrator():
     """Test the orchestrator endpoint with a sample intention result"""
@@ -34,14 +46,7 @@ def test_orchestrator():
 
     try:
         # Make the request
-        headers = {
-            "Content-Type": "application/json",
-            "Authorization": f"Bearer {API_KEY}",
-        }
-
-        response = requests.post(
-            ORCHESTRATOR_URL, json=sample_intention, headers=headers, timeout=30
-        )
+        response = _session.post(ORCHESTRATOR_URL, json=sample_intention, timeout=30)
 
         print(f"Status Code: {response.status_code}")
         print(f"Response Headers: {dict(response.headers)}")
@@ -77,7 +82,7 @@ def test_orchestrator():
 def test_health():
     """Test the health endpoint"""
     try:
-        response = requests.get("http://localhost:8000/health", timeout=5)
+        response = _session.get("http://localhost:8000/health", timeout=5)
         if response.status_code == 200:
             print("✅ Health check passed")
             print(response.json())
@@ -98,3 +103,5 @@ if __name__ == "__main__":
 
     # Test main endpoint
     test_orchestrator()
+
+    _session.close()
@@ -0,0 +1,29 @@
+import pytest
+
+from intentus.core.agent import IntentusAgent
+from intentus.core.formatters import PlannedStep
+
+
+def _plan(*depends_on):
+    return [
+        PlannedStep(context=f"c{i}", sub_goal=f"g{i}", tool_name="Tool", depends_on=deps)
+        for i, deps in enumerate(depends_on)
+    ]
+
+
+@pytest.mark.parametrize(
+    "depends_on, waves",
+    [
+        (([], [], []), [[0, 1, 2]]),
+        (([], [0], [1]), [[0], [1], [2]]),
+        (([], [], [0, 1]), [[0, 1], [2]]),
+        # Forward, self and out-of-range dependencies mean "the previous step".
+        (([1], [], []), [[0, 1, 2]]),
+        (([], [1], []), [[0, 2], [1]]),
+        (([], [], [7]), [[0, 1], [2]]),
+        (([], [], [-1]), [[0, 1], [2]]),
+        (([0], [], []), [[0, 1, 2]]),
+    ],
+)
+def test_plan_waves(depends_on, waves):
+    assert IntentusAgent._plan_waves(_plan(*depends_on)) == waves
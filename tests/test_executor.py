@@ -0,0 +1,86 @@
+import asyncio
+
+import pytest
+
+from intentus.core.cache import ToolResultCache
+from intentus.core.executor import Executor, _repair_json
+from intentus.tools.wikipedia_knowledge_searcher.tool import (
+    Wikipedia_Knowledge_Searcher_Tool,
+)
+
+TOOL = "Wikipedia_Knowledge_Searcher_Tool"
+
+
+def _make_executor(tool, tmp_path, monkeypatch):
+    monkeypatch.setenv("OPENAI_API_KEY", "test")
+    return Executor(
+        llm_engine="gpt-4.1-mini",
+        toolbox_metadata={TOOL: tool.get_metadata()},
+        available_tools=[TOOL],
+        verbose=False,
+        tool_cache=ToolResultCache(str(tmp_path / "tools")),
+        tool_instances={TOOL: tool},
+    )
+
+
+def test_wikipedia_errors_are_not_cached(tmp_path, monkeypatch):
+    tool = Wikipedia_Knowledge_Searcher_Tool()
+    calls = []
+
+    async def failing_fetch(query, max_length):
+        calls.append(query)
+        raise ConnectionError("network down")
+
+    monkeypatch.setattr(tool, "_fetch", failing_fetch)
+    executor = _make_executor(tool, tmp_path, monkeypatch)
+
+    async def run():
+        first = await executor.execute_tool_command(TOOL, "Paris")
+        second = await executor.execute_tool_command(TOOL, "Paris")
+        return first, second
+
+    first, second = asyncio.run(run())
+
+    assert first["content"].startswith("Error searching Wikipedia")
+    assert second["content"].startswith("Error searching Wikipedia")
+    assert calls == ["Paris", "Paris"]
+
+
+def test_wikipedia_results_are_cached(tmp_path, monkeypatch):
+    tool = Wikipedia_Knowledge_Searcher_Tool()
+    tool._results.clear()
+    calls = []
+
+    async def fetch(query, max_length):
+        calls.append(query)
+        return {"search_results": [query], "content": "The capital of France."}
+
+    monkeypatch.setattr(tool, "_fetch", fetch)
+    executor = _make_executor(tool, tmp_path, monkeypatch)
+
+    async def run():
+        await executor.execute_tool_command(TOOL, "Lyon")
+        tool._results.clear()  # only the executor's on-disk cache is left
+        return await executor.execute_tool_command(TOOL, "Lyon")
+
+    assert asyncio.run(run())["search_results"] == ["Lyon"]
+    assert calls == ["Lyon"]
+
+
+@pytest.mark.parametrize(
+    "text, expected",
+    [
+        ('{"command": "Paris"}', {"command": "Paris"}),
+        ('```json\n{"command": "Paris"}\n```', {"command": "Paris"}),
+        ('```\n{"command": "Paris"}\n```', {"command": "Paris"}),
+        ('Here it is: {"command": "Paris"} Hope that helps', {"command": "Paris"}),
+        ('{"command": "Paris",}', {"command": "Paris"}),
+        ('{"args": [1, 2,],\n}', {"args": [1, 2]}),
+        ('{"command": "a } in a string"} {"other": 1}', {"command": "a } in a string"}),
+        ('{"command": "Paris"', None),
+        ("no json here", None),
+        ("{not: json}", None),
+    ],
+)
+def test_repair_json(text, expected):
+    assert _repair_json(text) == expected
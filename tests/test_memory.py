@@ -0,0 +1,48 @@
+import asyncio
+
+import pytest
+
+from intentus.core.memory import Memory
+
+
+class _Summarizer:
+    def __init__(self):
+        self.prompts = []
+
+    async def __call__(self, prompt):
+        self.prompts.append(prompt)
+        return "S"
+
+
+def _steps(window):
+    return [
+        "S" if "summary_of_earlier_steps" in action else action["step"]
+        for action in window.get_actions()
+    ]
+
+
+@pytest.mark.parametrize(
+    "max_history, added, k, summarized, window",
+    [
+        # Too few actions outside the window to summarize yet
+        (None, 4, 4, False, [0, 1, 2, 3]),
+        (None, 10, 2, True, [0, "S", 8, 9]),
+        (None, 10, 4, True, [0, "S", 6, 7, 8, 9]),
+        # The first steps have already been dropped by max_history
+        (5, 10, 2, True, ["S", 8, 9]),
+        (5, 10, 4, True, ["S", 6, 7, 8, 9]),
+        (3, 10, 4, True, ["S", 7, 8, 9]),
+    ],
+)
+def test_windowed_after_summarize_older(max_history, added, k, summarized, window):
+    memory = Memory(max_history=max_history)
+    for step in range(added):
+        memory.add_action(step, "Tool", f"g{step}", f"c{step}", f"r{step}")
+    summarizer = _Summarizer()
+
+    asyncio.run(memory.summarize_older(summarizer, k=k))
+    view = memory.windowed(k=k)
+
+    assert bool(summarizer.prompts) is summarized
+    assert _steps(view) == window
+    assert view.get_actions_text() == str(view.get_actions())
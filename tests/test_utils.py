@@ -0,0 +1,44 @@
+import pytest
+
+from intentus.core.utils import StreamingFieldExtractor
+
+
+def _feed_all(field, chunks):
+    extractor = StreamingFieldExtractor(field)
+    values = [extractor.feed(chunk) for chunk in chunks]
+    return [value for value in values if value is not None], extractor.text
+
+
+@pytest.mark.parametrize(
+    "chunks, expected",
+    [
+        (['{"command": "Paris"}'], "Paris"),
+        (['{"comm', 'and": "Par', 'is"}'], "Paris"),
+        (['{"command"', " ", ':  "Paris"}'], "Paris"),
+        (['{"c', "o", "m", "m", "a", "n", "d", '"', ":", '"', "P", '"}'], "P"),
+        (['{"command": "say \\"hi\\""}'], 'say "hi"'),
+        (['{"command": "say \\', '"hi\\', '""}'], 'say "hi"'),
+        (['{"command": "a\\\\', '"}'], "a\\"),
+        (['{"command": "line\\nbreak"}'], "line\nbreak"),
+        # A key that is not followed by a string is skipped
+        (['{"command": 1, "text": "\\"command\\": ", "command": "Lyon"}'], "Lyon"),
+        (['{"other": "command"}', ', "command": "Nice"}'], "Nice"),
+    ],
+)
+def test_streaming_field_extractor(chunks, expected):
+    values, text = _feed_all("command", chunks)
+    assert values == [expected]
+    assert text == "".join(chunks)
+
+
+@pytest.mark.parametrize(
+    "chunks",
+    [
+        ['{"command": "unterminated'],
+        ['{"command": "escaped quote \\"'],
+        ['{"other": "value"}'],
+        ['{"command": 42}'],
+    ],
+)
+def test_streaming_field_extractor_incomplete(chunks):
+    assert _feed_all("command", chunks)[0] == []